@@ -0,0 +1,315 @@
+"""
+Hot/cold split of transactions by year (``ARCHIVE_HOT_YEARS``).
+
+Most reads touch the last few months, but ``transactions`` and its indexes
+grow with every year of history. With archiving on, rows dated before the
+last ``ARCHIVE_HOT_YEARS`` calendar years are moved out of ``transactions``
+into one table per year:
+
+- PostgreSQL: ``transactions_archive`` is a declaratively partitioned table
+  (``PARTITION BY RANGE (date)``) and each year is a partition of it
+- SQLite: each year is a plain ``transactions_archive_<year>`` table
+
+Either way the years are named ``transactions_archive_<year>`` and read the
+same way. A background mover (``start_mover``) moves rows in batches on
+every shard; it also moves archived years back when ``ARCHIVE_HOT_YEARS`` is
+raised, and everything back when it is set to 0. Ids are never reused (on
+SQLite ``transactions`` is an AUTOINCREMENT table; ``install`` migrates older
+databases), so an archived id can't come back as a new hot row.
+
+``transaction_source(db, start, end)`` is what read paths query instead of
+``Transaction``: it is ``Transaction`` itself unless the date range reaches
+before the hot cutoff, and only then a UNION ALL of ``transactions`` and the
+archived years inside the range. Archived rows keep their ids; editing or
+deleting one moves it back first (``restore``).
+
+To run one pass by hand:
+
+    python -m app.archive move
+"""
+import argparse
+import re
+import threading
+import time
+from datetime import date
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, inspect, insert, select, text, union_all
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import shard_engines
+from app.models import Transaction
+
+_YEAR_TABLE = re.compile(r"^transactions_archive_(\d{4})$")
+
+metadata = MetaData()
+hot = Transaction.__table__
+
+
+def _columns(partition_key: bool = False) -> list:
+    """Copies of the transaction columns, without foreign keys or defaults"""
+    return [
+        Column(
+            column.name, column.type, nullable=column.nullable,
+            primary_key=column.primary_key or (partition_key and column.name == "date")
+        )
+        for column in hot.columns
+    ]
+
+
+# PostgreSQL parent table; its primary key has to include the partition key
+archive_parent = Table(
+    "transactions_archive",
+    metadata,
+    *_columns(partition_key=True),
+    Index("ix_transactions_archive_user_date", "user_id", "date"),
+    Index("ix_transactions_archive_user_change_seq", "user_id", "change_seq"),
+    postgresql_partition_by="RANGE (date)"
+)
+
+_year_tables = {}
+
+# engine -> (schema token, archived years), see archived_years()
+_years_cache = {}
+
+
+def year_table(year: int) -> Table:
+    """The archive table (or partition) holding `year`"""
+    if year not in _year_tables:
+        name = f"transactions_archive_{year}"
+        _year_tables[year] = Table(
+            name,
+            metadata,
+            *_columns(),
+            Index(f"ix_{name}_user_date", "user_id", "date"),
+            Index(f"ix_{name}_user_change_seq", "user_id", "change_seq")
+        )
+    return _year_tables[year]
+
+
+def hot_cutoff():
+    """First day kept in ``transactions`` (None when archiving is off)"""
+    if settings.ARCHIVE_HOT_YEARS <= 0:
+        return None
+    return date(date.today().year - settings.ARCHIVE_HOT_YEARS + 1, 1, 1)
+
+
+def _schema_token(conn):
+    """Cheap value that changes whenever archive tables are added or dropped
+    (None where there is none: every call then lists the tables)"""
+    if conn.dialect.name == "sqlite":
+        return conn.exec_driver_sql("PRAGMA schema_version").scalar()
+    if conn.dialect.name == "postgresql":
+        return tuple(conn.execute(text(
+            "SELECT count(*), max(inhrelid::bigint) FROM pg_inherits "
+            "WHERE inhparent = to_regclass('transactions_archive')"
+        )).one())
+    return None
+
+
+def archived_years(conn) -> list:
+    """Years that have an archive table on the connection's database.
+
+    Cached per engine and listed again only when the schema token changes
+    (another process may archive a new year), or after ``move`` here.
+    """
+    token = _schema_token(conn)
+    cached = _years_cache.get(conn.engine)
+    if token is not None and cached and cached[0] == token:
+        return cached[1]
+    matches = (_YEAR_TABLE.match(name) for name in inspect(conn).get_table_names())
+    years = sorted(int(match.group(1)) for match in matches if match)
+    _years_cache[conn.engine] = (token, years)
+    return years
+
+
+def year_tables(db) -> list:
+    """Archive tables present on the session's database"""
+    return [year_table(year) for year in archived_years(db.connection())]
+
+
+def transaction_source(db, start: date = None, end: date = None):
+    """What to query for transactions dated between `start` and `end` (either open).
+
+    ``Transaction`` when the range stays in the hot years; otherwise an alias
+    of it over ``transactions`` UNION ALL the archived years in the range, with
+    the same attributes, so filters and projections work unchanged.
+    """
+    cutoff = hot_cutoff()
+    if cutoff is None or (start is not None and start >= cutoff):
+        return Transaction
+    years = [
+        year for year in archived_years(db.connection())
+        if (start is None or year >= start.year) and (end is None or year <= end.year)
+    ]
+    if not years:
+        return Transaction
+    combined = union_all(
+        select(*hot.columns),
+        *(select(*(year_table(year).c[column.name] for column in hot.columns)) for year in years)
+    )
+    return aliased(Transaction, combined.subquery("transactions_all"))
+
+
+def restore(db, user_id: int, transaction_id: int) -> bool:
+    """Move one archived transaction back to ``transactions`` in the session's
+    transaction, so it can be edited or deleted; False if it isn't archived"""
+    names = [column.name for column in hot.columns]
+    for table in year_tables(db):
+        condition = (table.c.id == transaction_id, table.c.user_id == user_id)
+        moved = db.execute(insert(hot).from_select(
+            names, select(*(table.c[name] for name in names)).where(*condition)
+        ))
+        if moved.rowcount:
+            db.execute(delete(table).where(*condition))
+            return True
+    return False
+
+
+def _copy_of_hot(name: str = None) -> Table:
+    """``transactions`` in a scratch MetaData (with the tables its foreign keys
+    point to), to create under another name"""
+    scratch = MetaData()
+    for referenced in {fk.column.table for fk in hot.foreign_keys}:
+        referenced.to_metadata(scratch)
+    return hot.to_metadata(scratch, name=name)
+
+
+def install(engine):
+    """Rebuild a SQLite ``transactions`` table created without AUTOINCREMENT,
+    whose ids could otherwise repeat those of archived rows"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transactions'"
+        )).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            return
+        _lock(conn)
+        names = [column.name for column in hot.columns]
+        existing = {column["name"] for column in inspect(conn).get_columns("transactions")}
+        copied = ", ".join(name for name in names if name in existing)
+        rebuilt = _copy_of_hot("transactions_rebuilt")
+        conn.execute(CreateTable(rebuilt))
+        conn.execute(text(f"INSERT INTO transactions_rebuilt ({copied}) SELECT {copied} FROM transactions"))
+        # Drops the old indexes and search triggers too; both are recreated below
+        # and by search.install
+        conn.execute(text("DROP TABLE transactions"))
+        conn.execute(text("ALTER TABLE transactions_rebuilt RENAME TO transactions"))
+        for index in hot.indexes:
+            index.create(conn)
+
+        # Continue after the highest id in use anywhere, archived years included
+        highest = max([0] + [
+            conn.execute(select(func.max(table.c.id))).scalar() or 0
+            for table in [hot] + [year_table(year) for year in archived_years(conn)]
+        ])
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'transactions'"))
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('transactions', :seq)"), {"seq": highest})
+    print("✓ Rebuilt transactions with AUTOINCREMENT ids")
+
+
+def _lock(conn):
+    if conn.dialect.name == "sqlite":
+        # Take the write lock before reading which rows to move
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _ensure_year(conn, year: int):
+    if conn.dialect.name == "postgresql":
+        archive_parent.create(conn, checkfirst=True)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {year_table(year).name} PARTITION OF transactions_archive "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+    else:
+        year_table(year).create(conn, checkfirst=True)
+
+
+def _copy(conn, source: Table, target: Table, condition) -> int:
+    names = [column.name for column in hot.columns]
+    conn.execute(insert(target).from_select(names, select(*(source.c[name] for name in names)).where(condition)))
+    return conn.execute(delete(source).where(condition)).rowcount
+
+
+def _archive_batch(engine, cutoff: date) -> int:
+    """Move up to ARCHIVE_BATCH_SIZE rows dated before `cutoff` to their years"""
+    with engine.begin() as conn:
+        _lock(conn)
+        rows = conn.execute(
+            select(hot.c.id, hot.c.date).where(hot.c.date < cutoff).limit(
+                settings.ARCHIVE_BATCH_SIZE
+            ).with_for_update()
+        ).all()
+        by_year = {}
+        for txn_id, txn_date in rows:
+            by_year.setdefault(txn_date.year, []).append(txn_id)
+        for year, ids in by_year.items():
+            _ensure_year(conn, year)
+            _copy(conn, hot, year_table(year), hot.c.id.in_(ids))
+        return len(rows)
+
+
+def _restore_batch(engine, year: int) -> int:
+    """Move up to ARCHIVE_BATCH_SIZE rows of an archived year back to ``transactions``,
+    dropping the year once it is empty"""
+    table = year_table(year)
+    with engine.begin() as conn:
+        _lock(conn)
+        ids = conn.scalars(select(table.c.id).limit(settings.ARCHIVE_BATCH_SIZE)).all()
+        if not ids:
+            table.drop(conn)
+            return 0
+        return _copy(conn, table, hot, table.c.id.in_(ids))
+
+
+def move(engine) -> tuple:
+    """Bring one database in line with the hot cutoff; returns (archived, restored) rows"""
+    cutoff = hot_cutoff()
+    _years_cache.pop(engine, None)
+    restored = 0
+    with engine.connect() as conn:
+        years = archived_years(conn)
+    for year in years:
+        if cutoff is None or date(year, 1, 1) >= cutoff:
+            while (moved := _restore_batch(engine, year)):
+                restored += moved
+
+    archived = 0
+    if cutoff is not None:
+        while (moved := _archive_batch(engine, cutoff)):
+            archived += moved
+    _years_cache.pop(engine, None)
+    return archived, restored
+
+
+def start_mover():
+    """Run ``move`` on every shard now and then every ARCHIVE_INTERVAL_SECONDS"""
+    def run():
+        while True:
+            for shard, engine in enumerate(shard_engines):
+                try:
+                    archived, restored = move(engine)
+                except Exception as e:  # try again next round
+                    print(f"⚠️  Archive mover failed on shard {shard}: {e}")
+                    continue
+                if archived or restored:
+                    print(f"✓ Shard {shard}: archived {archived} transactions, restored {restored}")
+            if not settings.ARCHIVE_HOT_YEARS:
+                return  # off: one pass moves anything archived back
+            time.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+
+    threading.Thread(target=run, name="archive-mover", daemon=True).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old transactions to (or back from) the yearly archive")
+    parser.add_argument("command", choices=["move"], help="move: run one mover pass on every shard")
+    args = parser.parse_args()
+
+    for shard, engine in enumerate(shard_engines):
+        archived, restored = move(engine)
+        print(f"✓ Shard {shard}: archived {archived} transactions, restored {restored}")
+    print("\n✅ Done")
@@ -0,0 +1,194 @@
+"""
+Static asset pipeline.
+
+Builds the Tailwind stylesheet and copies vendored JS into ``app/static/dist``
+under content-hashed filenames, alongside gzip/brotli variants and a
+``manifest.json`` mapping logical names to the hashed files.
+
+Rebuild after changing templates or vendored files:
+
+    python -m app.assets build
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip variants are always built
+    brotli = None
+
+STATIC_DIR = "app/static"
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+CSS_SOURCE = "assets/src/app.css"
+VENDOR_FILES = {
+    "chart.js": "assets/vendor/chart.umd.min.js",
+}
+
+# Hashed files never change under the same name
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred order when the client accepts several encodings
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest = None
+
+
+def load_manifest() -> dict:
+    """Load the logical name -> hashed filename manifest (cached)"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH) as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(name: str) -> str:
+    """Template helper: URL of the hashed build of a logical asset name"""
+    hashed = load_manifest().get(name)
+    if hashed:
+        return f"/static/dist/{hashed}"
+    return f"/static/{name}"
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Parse an Accept-Encoding header into the set of acceptable codings"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves .br/.gz siblings and caches hashed builds forever"""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        is_dist = os.path.dirname(full_path) == os.path.realpath(DIST_DIR)
+
+        response = None
+        if is_dist:
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    variant_stat = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                response = FileResponse(
+                    full_path + suffix,
+                    status_code=status_code,
+                    stat_result=variant_stat,
+                    media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+                    headers={"Content-Encoding": encoding},
+                )
+                break
+
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        if is_dist:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["Vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _hashed_name(name: str, content: bytes) -> str:
+    stem, ext = os.path.splitext(name)
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    return f"{stem}.{digest}{ext}"
+
+
+def _write_variants(path: str, content: bytes):
+    """Write the file plus its precompressed siblings"""
+    with open(path, "wb") as f:
+        f.write(content)
+    with open(path + ".gz", "wb") as f:
+        # mtime=0 keeps the output byte-identical across builds
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=9, mtime=0) as gz:
+            gz.write(content)
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(content, quality=11))
+
+
+def build_css() -> bytes:
+    """Compile and purge the Tailwind stylesheet against the templates"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "app.css")
+        subprocess.run(
+            [settings.TAILWIND_BIN, "-i", CSS_SOURCE, "-o", output, "--minify"],
+            check=True
+        )
+        with open(output, "rb") as f:
+            return f.read()
+
+
+def build():
+    """Build every asset into DIST_DIR and rewrite the manifest"""
+    global _manifest
+
+    outputs = {"app.css": build_css()}
+    for name, source in VENDOR_FILES.items():
+        with open(source, "rb") as f:
+            outputs[name] = f.read()
+
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    manifest = {}
+    for name, content in outputs.items():
+        hashed = _hashed_name(name, content)
+        _write_variants(os.path.join(DIST_DIR, hashed), content)
+        manifest[name] = hashed
+        print(f"✓ {name} -> dist/{hashed} ({len(content) // 1024} KB)")
+
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    _manifest = manifest
+    if brotli is None:
+        print("⚠️  brotli not installed, only gzip variants were written")
+    return manifest
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        print("Usage: python -m app.assets build")
+        sys.exit(1)
+    build()
@@ -1,9 +1,12 @@
 import bcrypt
+import os
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from fastapi import Request, HTTPException, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from app.models import User
+from app import repository
 
 
 def hash_password(password: str) -> str:
@@ -11,18 +14,30 @@ def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 
+def hash_passwords(passwords: list) -> list:
+    """Hash many passwords in parallel (bcrypt releases the GIL)"""
+    if len(passwords) <= 1:
+        return [hash_password(p) for p in passwords]
+    with ThreadPoolExecutor(max_workers=min(len(passwords), os.cpu_count() or 1)) as pool:
+        return list(pool.map(hash_password, passwords))
+
+
 def verify_password(password: str, hashed: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
 
 def get_current_user(request: Request, db: Session) -> User:
-    """Get the current logged-in user from session"""
+    """Get the current logged-in user from session (None once they are disabled)"""
     user_id = request.session.get("user_id")
     if not user_id:
         return None
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = repository.user_by_id(db, user_id)
+    if user is None or not user.is_active:
+        # Disabled or being deleted: end the session instead of letting it write
+        request.session.clear()
+        return None
     return user
 
 
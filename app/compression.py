@@ -0,0 +1,179 @@
+"""
+Response compression middleware.
+
+Negotiates brotli or gzip from Accept-Encoding and compresses responses whose
+content type is on the allowlist and whose body reaches the size threshold.
+Streaming responses (e.g. CSV exports) are compressed chunk by chunk and
+flushed as they go, so the body is never buffered beyond the threshold.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.assets import accepted_encodings
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # fall back to gzip-only negotiation
+    brotli = None
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31 -> gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware for brotli/gzip response compression"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = None,
+        content_types: tuple = None,
+        gzip_level: int = None,
+        brotli_quality: int = None
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.content_types = frozenset(content_types or settings.COMPRESSION_CONTENT_TYPES)
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+
+    def _select_encoding(self, scope):
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._select_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressionResponder(self, encoding, send)(scope, receive, self.app)
+
+
+class _CompressionResponder:
+    """Per-request state: decides on the first body chunks, then streams"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.pending = []
+        self.pending_size = 0
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, app):
+        await app(scope, receive, self.send_wrapper)
+
+    def _is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in self.middleware.content_types:
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.middleware.minimum_size:
+            return False
+        return True
+
+    async def _flush_uncompressed(self):
+        self.passthrough = True
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": b"".join(self.pending)})
+        self.pending = []
+
+    async def _start_compressing(self, more_body: bool):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+
+        self.encoder = self.middleware._encoder(self.encoding)
+        body = self.encoder.compress(b"".join(self.pending))
+        self.pending = []
+        if not more_body:
+            body += self.encoder.finish()
+            headers["Content-Length"] = str(len(body))
+
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def send_wrapper(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            if not self._is_compressible(Headers(raw=message["headers"])):
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if self.passthrough or self.start_message is None:
+            await self.send(message)
+            return
+
+        if message_type != "http.response.body":
+            # e.g. http.response.pathsend: the server sends the file as-is
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is not None:
+            # Already streaming: compress and flush this chunk straight away
+            chunk = self.encoder.compress(body) if body else b""
+            if not more_body:
+                chunk += self.encoder.finish()
+            if chunk or not more_body:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        # Hold back at most `minimum_size` bytes until we know it is worth it
+        if body:
+            self.pending.append(body)
+            self.pending_size += len(body)
+
+        if self.pending_size >= self.middleware.minimum_size:
+            await self._start_compressing(more_body)
+        elif not more_body:
+            await self._flush_uncompressed()
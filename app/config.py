@@ -7,13 +7,87 @@ class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./expense_manager.db")
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    
+    # Optional extra shards (comma-separated URLs); DATABASE_URL is always shard 0
+    # and also holds the users table and the user -> shard map
+    DATABASE_SHARD_URLS: list = [
+        url.strip().replace("postgres://", "postgresql://", 1)
+        for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url.strip()
+    ]
+    
+    # Optional read replicas (comma-separated URLs) for analytics, lists and exports
+    DATABASE_REPLICA_URLS: list = [
+        url.strip().replace("postgres://", "postgresql://", 1)
+        for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    # Replicas of the extra shards: one group per shard in DATABASE_SHARD_URLS
+    # order, groups separated by ";" and URLs within a group by "," (leave a
+    # group empty for a shard without replicas)
+    DATABASE_SHARD_REPLICA_URLS: list = [
+        [url.strip().replace("postgres://", "postgresql://", 1) for url in group.split(",") if url.strip()]
+        for group in os.getenv("DATABASE_SHARD_REPLICA_URLS", "").split(";")
+    ]
+    # After a write, a user's reads stay on the primary for this long
+    REPLICA_STICKY_SECONDS: int = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+    
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     
     # Session settings
     SESSION_COOKIE_NAME: str = "expense_session"
     SESSION_MAX_AGE: int = 86400 * 7  # 7 days
     
+    # Per-user account/category cache (see app/services/reference_service.py);
+    # entries expire after this many seconds so other workers' writes show up
+    REFERENCE_CACHE_TTL: int = int(os.getenv("REFERENCE_CACHE_TTL", "30"))
+    
+    # Streamed HTML for long list pages (see app/streaming.py)
+    STREAM_HTML_ENABLED: bool = os.getenv("STREAM_HTML_ENABLED", "true").lower() == "true"
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", "16384"))
+    # Rows fetched per round trip while streaming
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+    
     # Pagination
     ITEMS_PER_PAGE: int = 20
+    
+    # Asset pipeline (see app/assets.py)
+    TAILWIND_BIN: str = os.getenv("TAILWIND_BIN", "tailwindcss")
+    
+    # Response compression (see app/compression.py)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_CONTENT_TYPES: list = os.getenv(
+        "COMPRESSION_CONTENT_TYPES",
+        "text/html,text/css,text/plain,text/csv,text/javascript,application/javascript,application/json,image/svg+xml"
+    ).split(",")
+    
+    # Prometheus metrics at /metrics (see app/metrics.py), off by default; with
+    # a token set, scrapers must send "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    
+    # Per-request SQL profiler (see app/profiler.py), off by default
+    SQL_PROFILER_ENABLED: bool = os.getenv("SQL_PROFILER_ENABLED", "false").lower() == "true"
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+    
+    # Live dashboard updates over SSE (see app/events.py); set a Redis URL to
+    # relay events between workers
+    EVENTS_REDIS_URL: str = os.getenv("EVENTS_REDIS_URL", "")
+    EVENTS_KEEPALIVE_SECONDS: int = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+    
+    # Group commit for SQLite writes (see app/group_commit.py), off by default
+    WRITE_BATCHING_ENABLED: bool = os.getenv("WRITE_BATCHING_ENABLED", "false").lower() == "true"
+    WRITE_BATCH_SIZE: int = int(os.getenv("WRITE_BATCH_SIZE", "64"))
+    WRITE_BATCH_WAIT_MS: float = float(os.getenv("WRITE_BATCH_WAIT_MS", "2"))
+    
+    # Yearly archive of old transactions (see app/archive.py): rows dated before
+    # the last ARCHIVE_HOT_YEARS calendar years are moved out of the hot table;
+    # 0 turns it off (and moves archived rows back)
+    ARCHIVE_HOT_YEARS: int = int(os.getenv("ARCHIVE_HOT_YEARS", "0"))
+    ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+    # Rows moved per transaction, so the mover never holds locks for long
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
 
 settings = Settings()
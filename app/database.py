@@ -1,23 +1,218 @@
-from sqlalchemy import create_engine
+import contextvars
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Request
+from sqlalchemy import Column, Integer, Table, create_engine, delete, event, insert, select
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app import search, sync
 from app.config import settings
+from app.metrics import instrument_engine
+from app.profiler import attach_profiler
+
+
+def _create_engine(url: str):
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {}
+    )
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+    if settings.SQL_PROFILER_ENABLED:
+        attach_profiler(engine)
+    return engine
+
 
 # Create engine based on database URL
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Per-user shards: shard 0 is the primary database, which also holds the users
+# table and the shard map. Each user's accounts, transactions, categories and
+# budgets live on their home shard.
+shard_engines = [engine] + [_create_engine(url) for url in settings.DATABASE_SHARD_URLS]
+
+# Read replicas (optional), per shard: analytics, list views and exports read
+# from these
+replica_engines = [[_create_engine(url) for url in settings.DATABASE_REPLICA_URLS]] + [
+    [_create_engine(url) for url in urls]
+    for urls in settings.DATABASE_SHARD_REPLICA_URLS[:len(settings.DATABASE_SHARD_URLS)]
+]
+replica_engines += [[] for _ in range(len(shard_engines) - len(replica_engines))]
+
+# Tables that only live on the primary, whatever the session's shard
+GLOBAL_TABLES = {"users", "user_shards"}
+
+
+class RoutingSession(Session):
+    """Session that routes statements to the right shard and replica.
+
+    ``info["shard"]`` picks the engine for per-user tables; users and the
+    shard map always use the primary. When opened with ``info["read_only"]``,
+    reads go to one of that shard's replicas instead, if it has any (sticky
+    per session so its queries see a consistent snapshot). Writes and
+    flushes always use the primary of their shard.
+    """
+
+    def _shard(self, mapper) -> int:
+        table = getattr(mapper, "local_table", None)
+        if table is not None and table.name in GLOBAL_TABLES:
+            return 0
+        return self.info.get("shard", 0)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        shard = self._shard(mapper)
+        if (
+            self.info.get("read_only")
+            and replica_engines[shard]
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+        ):
+            replicas = self.info.setdefault("replicas", {})
+            if shard not in replicas:
+                replicas[shard] = random.choice(replica_engines[shard])
+            return replicas[shard]
+        return shard_engines[shard]
+
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+# Stamp per-user changes with the user's sync sequence
+event.listen(SessionLocal, "before_flush", sync.stamp_changes)
 
 # Create Base class for models
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+# Home shard of each user (on the primary). Users without a row live on shard 0.
+user_shards = Table(
+    "user_shards",
+    Base.metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("shard", Integer, nullable=False)
+)
+
+# Shard assignments never change, so every process can cache them
+_shard_cache = {}
+
+
+def create_all_tables():
+    """Create any missing tables (plus the search index and sync columns) on every shard"""
+    from app import archive  # imports this module
+
+    for shard_engine in shard_engines:
+        Base.metadata.create_all(bind=shard_engine)
+        archive.install(shard_engine)
+        search.install(shard_engine)
+        sync.install(shard_engine)
+
+
+def shard_for_user(user_id: int) -> int:
+    """Home shard of a user (0 when sharding is off or the user is unmapped)"""
+    if not user_id or len(shard_engines) == 1:
+        return 0
+    if user_id not in _shard_cache:
+        with engine.connect() as conn:
+            shard = conn.execute(
+                select(user_shards.c.shard).where(user_shards.c.user_id == user_id)
+            ).scalar()
+        _shard_cache[user_id] = shard or 0
+    return _shard_cache[user_id]
+
+
+def assign_shards(user_ids: list) -> dict:
+    """Pick home shards for newly created users, returning {user_id: shard}.
+
+    The user rows stay on the primary; copies are written to each home shard
+    so the per-user tables' foreign keys hold there too.
+    """
+    if len(shard_engines) == 1:
+        return {user_id: 0 for user_id in user_ids}
+
+    shards = {user_id: user_id % len(shard_engines) for user_id in user_ids}
+    users = Base.metadata.tables["users"]
+    with engine.begin() as conn:
+        conn.execute(insert(user_shards), [{"user_id": u, "shard": s} for u, s in shards.items()])
+        rows = [dict(row._mapping) for row in conn.execute(select(users).where(users.c.id.in_(user_ids)))]
+    for shard in set(shards.values()) - {0}:
+        copies = [row for row in rows if shards[row["id"]] == shard]
+        with shard_engines[shard].begin() as conn:
+            conn.execute(insert(users), copies)
+    _shard_cache.update(shards)
+    return shards
+
+
+def release_shard(user_id: int):
+    """Drop a deleted user's shard map entry and shard copy of the user row"""
+    shard = shard_for_user(user_id)
+    if shard != 0:
+        users = Base.metadata.tables["users"]
+        with shard_engines[shard].begin() as conn:
+            conn.execute(delete(users).where(users.c.id == user_id))
+    with engine.begin() as conn:
+        conn.execute(delete(user_shards).where(user_shards.c.user_id == user_id))
+    _shard_cache.pop(user_id, None)
+
+
+def session_for_user(user_id: int) -> Session:
+    """New session bound to a user's home shard"""
+    return SessionLocal(info={"shard": shard_for_user(user_id)})
+
+
+def fan_out(query):
+    """Run ``query(session)`` on every shard in parallel and return the results"""
+    def run(shard):
+        db = SessionLocal(info={"shard": shard})
+        try:
+            return query(db)
+        finally:
+            db.close()
+
+    if len(shard_engines) == 1:
+        return [run(0)]
+    # Each worker runs in a copy of the caller's context, so its queries still
+    # count towards the request's metrics
+    shards = range(len(shard_engines))
+    contexts = [contextvars.copy_context() for _ in shards]
+    with ThreadPoolExecutor(max_workers=len(shard_engines)) as pool:
+        return list(pool.map(lambda context, shard: context.run(run, shard), contexts, shards))
+
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def _mark_write(request: Request):
+    """Pin this user's reads to the primary for a while (read-your-writes)"""
+    if any(replica_engines) and request.method in WRITE_METHODS and "session" in request.scope:
+        request.session["primary_until"] = time.time() + settings.REPLICA_STICKY_SECONDS
+
+
+def _reads_pinned_to_primary(request: Request) -> bool:
+    if "session" not in request.scope:
+        return False
+    return request.session.get("primary_until", 0) > time.time()
+
+
+def _request_shard(request: Request) -> int:
+    if "session" not in request.scope:
+        return 0
+    return shard_for_user(request.session.get("user_id"))
+
+
+# Dependency to get DB session (on the logged-in user's shard)
+def get_db(request: Request):
+    _mark_write(request)
+    db = SessionLocal(info={"shard": _request_shard(request)})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only routes: served from a replica when one is configured
+def get_read_db(request: Request):
+    db = SessionLocal(info={"shard": _request_shard(request)})
+    db.info["read_only"] = not _reads_pinned_to_primary(request)
     try:
         yield db
     finally:
@@ -0,0 +1,183 @@
+"""
+Per-user change events, pushed to open pages over Server-Sent Events.
+
+Writers call ``publish(user_id, event)`` after committing; every ``/events``
+stream open for that user receives the event. Events carry deltas (balance
+and aggregate changes) so the dashboard can update in place instead of
+re-running the analytics queries.
+
+Delivery goes through a backend:
+
+- ``LocalBackend`` (default) hands events to this process's streams
+- ``RedisBackend`` (``EVENTS_REDIS_URL``, needs the ``redis`` package)
+  relays them through Redis pub/sub, so streams held by other workers
+  receive them too
+
+A stream that falls too far behind gets a single ``resync`` event instead of
+the backlog; the page then reloads. The Redis listener reconnects with
+backoff when its connection drops, and resyncs every stream afterwards since
+events published meanwhile were missed.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from app.config import settings
+
+try:
+    import redis
+except ImportError:  # only needed for the Redis backend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per open stream before it is told to resync
+QUEUE_SIZE = 100
+
+# Seconds between Redis reconnect attempts, doubling up to the maximum
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+# Most a publish may wait on Redis before the write's response goes out without it
+PUBLISH_TIMEOUT = 1.0
+
+
+class EventBroker:
+    """Fans events out to the open streams of each user in this process"""
+
+    def __init__(self):
+        self._subscribers = {}  # user id -> {queue: event loop}
+        self._lock = threading.Lock()
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.EVENTS_REDIS_URL:
+                self._backend = RedisBackend(settings.EVENTS_REDIS_URL, self.deliver, self.resync_all)
+            else:
+                self._backend = LocalBackend(self.deliver)
+        return self._backend
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Queue receiving the user's events; call from the stream's event loop"""
+        self.backend  # start listening before the first event can be missed
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(user_id, {})
+            queues.pop(queue, None)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id: int, event: dict):
+        self.backend.publish(user_id, event)
+
+    def deliver(self, user_id: int, event: dict):
+        """Hand an event to this process's streams (any thread)"""
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, {}).items())
+        for queue, loop in targets:
+            loop.call_soon_threadsafe(self._put, queue, event)
+
+    def resync_all(self):
+        """Tell every stream in this process to reload (after events may have been lost)"""
+        with self._lock:
+            targets = [item for queues in self._subscribers.values() for item in queues.items()]
+        for queue, loop in targets:
+            loop.call_soon_threadsafe(self._put, queue, {"type": "resync"})
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: dict):
+        if queue.full():
+            # Deltas can't be skipped, so drop the backlog and resync instead
+            while not queue.empty():
+                queue.get_nowait()
+            event = {"type": "resync"}
+        queue.put_nowait(event)
+
+
+class LocalBackend:
+    """Single-process delivery"""
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, user_id: int, event: dict):
+        self.deliver(user_id, event)
+
+
+class RedisBackend:
+    """Multi-worker delivery through a Redis pub/sub channel"""
+
+    CHANNEL = "expense_flow:events"
+
+    def __init__(self, url: str, deliver, resync):
+        if redis is None:
+            raise RuntimeError("EVENTS_REDIS_URL is set but the redis package is not installed")
+        # Separate clients: publishes time out quickly, the listener blocks on reads
+        self.client = redis.Redis.from_url(url)
+        self.publisher = redis.Redis.from_url(
+            url, socket_timeout=PUBLISH_TIMEOUT, socket_connect_timeout=PUBLISH_TIMEOUT
+        )
+        self.deliver = deliver
+        self.resync = resync
+        threading.Thread(target=self._listen, name="events-redis", daemon=True).start()
+
+    def publish(self, user_id: int, event: dict):
+        """Best effort: the write has already committed, so a Redis failure must not fail it"""
+        try:
+            self.publisher.publish(self.CHANNEL, json.dumps({"user_id": user_id, "event": event}))
+        except redis.RedisError as e:
+            # Whether it went out is unknown, so this process's streams reload
+            # rather than risk applying the delta twice
+            logger.warning("Could not publish event for user %s: %s", user_id, e)
+            self.deliver(user_id, {"type": "resync"})
+
+    def _listen(self):
+        """Relay channel messages for the life of the process, reconnecting on errors"""
+        delay = RECONNECT_DELAY
+        dropped = False
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.CHANNEL)
+                if dropped:
+                    logger.info("Reconnected to Redis events channel")
+                    self.resync()
+                    dropped = False
+                delay = RECONNECT_DELAY
+                for message in pubsub.listen():
+                    try:
+                        data = json.loads(message["data"])
+                        self.deliver(data["user_id"], data["event"])
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring malformed event message: %r", message.get("data"))
+            except Exception:
+                logger.exception("Redis events listener failed; reconnecting in %gs", delay)
+            finally:
+                dropped = True
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+
+broker = EventBroker()
+
+
+def publish(user_id: int, event: dict):
+    """Send `event` (a JSON-serialisable dict with a "type") to the user's open streams"""
+    broker.publish(user_id, event)
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
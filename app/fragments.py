@@ -0,0 +1,49 @@
+"""
+Partial-page responses for forms that update the page in place.
+
+Forms marked ``data-fragment`` are posted with fetch and an ``X-Fragment: 1``
+header (see base.html). Their routes answer with the fragments to swap in --
+the new or changed row/card, rendered from the same partial template the full
+page includes -- instead of redirecting to the whole list. Without JavaScript
+the forms post normally and get the redirect.
+
+    return fragment_response(
+        remove("transactionsEmpty"),
+        prepend("transactionRows", render(templates, "transactions/_row.html", {...}))
+    )
+"""
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+
+def wants_fragment(request: Request) -> bool:
+    """True when the form was posted by the fragment handler in base.html"""
+    return request.headers.get("X-Fragment") == "1"
+
+
+def render(templates, name: str, context: dict) -> str:
+    return templates.get_template(name).render(context)
+
+
+def replace(target: str, html: str) -> dict:
+    """Swap the element with id `target` for `html`"""
+    return {"action": "replace", "target": target, "html": html}
+
+
+def prepend(target: str, html: str) -> dict:
+    """Insert `html` as the first child of element `target`"""
+    return {"action": "prepend", "target": target, "html": html}
+
+
+def insert_before(target: str, html: str) -> dict:
+    """Insert `html` just before element `target`"""
+    return {"action": "before", "target": target, "html": html}
+
+
+def remove(target: str) -> dict:
+    """Remove element `target` if it is on the page"""
+    return {"action": "remove", "target": target}
+
+
+def fragment_response(*fragments) -> JSONResponse:
+    return JSONResponse({"fragments": list(fragments)})
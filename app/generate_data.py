@@ -0,0 +1,308 @@
+"""
+Synthetic data generator for local load testing.
+
+Creates N users, each with realistic accounts, categories, budgets and M
+transactions, using set-based bulk inserts. Account balances are replayed
+from the generated transactions, so they match what TransactionService
+would have produced.
+
+    python -m app.generate_data --users 50 --transactions 2000
+
+Generated users log in as ``<prefix>00000`` ... with the password given by
+``--password`` (default ``loadtest``) and skip the forced password change.
+They are written to the primary database, i.e. shard 0 when sharding is on.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.auth import hash_password
+from app.database import SessionLocal, create_all_tables
+from app.models import (
+    User, Account, Category, Transaction, Budget,
+    UserRole, AccountType, CategoryType, TransactionType
+)
+
+BATCH_SIZE = 5000
+
+INCOME_CATEGORIES = ["Salary", "Bonus", "Refund", "Investment Returns", "Gift Received", "Other Income"]
+EXPENSE_CATEGORIES = [
+    "Food & Dining", "Groceries", "Transportation", "Rent", "Utilities", "Healthcare",
+    "Entertainment", "Shopping", "Education", "Insurance", "Travel", "Other Expense"
+]
+CUSTOM_CATEGORIES = ["Pets", "Subscriptions", "Gym", "Kids", "Home Repair"]
+
+# Expense category -> (merchants, typical amount range)
+MERCHANTS = {
+    "Food & Dining": (["Swiggy", "Zomato", "Starbucks", "Domino's", "Cafe Coffee Day", "Haldiram's"], (80, 1500)),
+    "Groceries": (["BigBasket", "DMart", "Reliance Fresh", "Zepto", "Blinkit", "Nature's Basket"], (200, 4000)),
+    "Transportation": (["Uber", "Ola", "Rapido", "Indian Oil", "HP Petrol", "Metro Card"], (50, 3000)),
+    "Rent": (["House Rent"], (12000, 45000)),
+    "Utilities": (["BESCOM Electricity", "Airtel Broadband", "Jio Recharge", "Water Bill", "Gas Cylinder"], (200, 3500)),
+    "Healthcare": (["Apollo Pharmacy", "Practo", "MedPlus", "Lab Tests"], (150, 5000)),
+    "Entertainment": (["Netflix", "BookMyShow", "Spotify", "PVR Cinemas", "Hotstar"], (150, 2000)),
+    "Shopping": (["Amazon", "Flipkart", "Myntra", "Ajio", "Decathlon", "IKEA"], (300, 12000)),
+    "Education": (["Udemy", "Coursera", "Books", "School Fees"], (400, 25000)),
+    "Insurance": (["LIC Premium", "Health Insurance", "Car Insurance"], (1500, 20000)),
+    "Travel": (["IndiGo", "IRCTC", "MakeMyTrip", "Airbnb", "OYO"], (1500, 30000)),
+    "Other Expense": (["Misc", "Gift", "Donation", "ATM Withdrawal"], (100, 5000)),
+}
+# Mean of _amount() over the expense categories, used to size salaries
+AVG_EXPENSE = sum(low + (high - low) / 3.5 for _, (low, high) in MERCHANTS.values()) / len(MERCHANTS)
+
+BANKS = ["HDFC Bank", "ICICI Bank", "SBI", "Axis Bank", "Kotak Mahindra"]
+CARDS = ["HDFC Regalia", "ICICI Amazon Pay", "SBI SimplyClick", "Axis Flipkart"]
+
+
+def _chunks(rows: list, size: int = BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _bulk_insert(db: Session, model, rows: list):
+    for chunk in _chunks(rows):
+        db.execute(insert(model), chunk)
+
+
+def _ids_by_user(db: Session, model, user_ids: list) -> dict:
+    """user_id -> list of row objects (id, type, name) inserted for that user"""
+    result = {uid: [] for uid in user_ids}
+    for chunk in _chunks(user_ids, 500):
+        rows = db.execute(
+            select(model.user_id, model.id, model.type, model.name).where(model.user_id.in_(chunk))
+        ).all()
+        for row in rows:
+            result[row.user_id].append(row)
+    return result
+
+
+def _amount(rng: random.Random, low: float, high: float) -> float:
+    # Skewed towards the low end, like real spending
+    return round(low + (high - low) * rng.random() ** 2.5, 2)
+
+
+def _account_rows(rng: random.Random, user_id: int) -> list:
+    rows = []
+    for bank in rng.sample(BANKS, rng.randint(1, 2)):
+        balance = round(rng.uniform(20000, 300000), 2)
+        rows.append({
+            "user_id": user_id, "type": AccountType.BANK, "name": f"{bank} Savings",
+            "bank_name": bank, "account_number": f"{rng.randint(0, 9999):04d}",
+            "initial_balance": balance, "current_balance": balance
+        })
+    for card in rng.sample(CARDS, rng.randint(1, 2)):
+        rows.append({
+            "user_id": user_id, "type": AccountType.CREDIT_CARD, "name": card,
+            "total_limit": rng.choice([50000, 100000, 200000, 300000]), "used_amount": 0.0,
+            "billing_date": rng.randint(1, 28), "due_date": rng.randint(1, 28)
+        })
+    cash = round(rng.uniform(500, 10000), 2)
+    rows.append({
+        "user_id": user_id, "type": AccountType.CASH, "name": "Wallet",
+        "initial_balance": cash, "current_balance": cash
+    })
+    return rows
+
+
+def _category_rows(rng: random.Random, user_id: int) -> list:
+    rows = [
+        {"user_id": user_id, "name": name, "type": CategoryType.INCOME, "is_system": True}
+        for name in INCOME_CATEGORIES
+    ]
+    rows += [
+        {"user_id": user_id, "name": name, "type": CategoryType.EXPENSE, "is_system": True}
+        for name in EXPENSE_CATEGORIES
+    ]
+    rows += [
+        {"user_id": user_id, "name": name, "type": CategoryType.EXPENSE, "is_system": False}
+        for name in rng.sample(CUSTOM_CATEGORIES, rng.randint(0, 3))
+    ]
+    return rows
+
+
+def _apply(balances: dict, txn_type, amount: float, source, dest):
+    """Replay TransactionService.apply_transaction on in-memory balances"""
+    if txn_type == TransactionType.INCOME and dest is not None:
+        balances[dest.id] += amount
+    elif txn_type == TransactionType.EXPENSE and source is not None:
+        balances[source.id] += -amount if source.type != AccountType.CREDIT_CARD else amount
+    elif txn_type == TransactionType.TRANSFER and source is not None and dest is not None:
+        if source.type != AccountType.CREDIT_CARD:
+            balances[source.id] -= amount
+        if dest.type == AccountType.CREDIT_CARD:
+            balances[dest.id] = max(balances[dest.id] - amount, 0.0)
+        else:
+            balances[dest.id] += amount
+
+
+def _transaction_rows(rng, user_id, accounts, categories, count, days, balances, now) -> list:
+    banks = [a for a in accounts if a.type == AccountType.BANK]
+    cards = [a for a in accounts if a.type == AccountType.CREDIT_CARD]
+    cash = [a for a in accounts if a.type == AccountType.CASH]
+    spend_from = banks + cards + cash
+    expense_cats = [c for c in categories if c.type == CategoryType.EXPENSE]
+    salary = next(c for c in categories if c.name == "Salary")
+    income_cats = [c for c in categories if c.type == CategoryType.INCOME]
+
+    start = now.date() - timedelta(days=days)
+    dates = sorted(start + timedelta(days=rng.randrange(days + 1)) for _ in range(count))
+    # Salary covers the month's spending with some left over
+    monthly_salary = max(count / max(days / 30.0, 1.0), 1.0) * AVG_EXPENSE * rng.uniform(1.02, 1.15)
+
+    rows = []
+    last_salary_month = None
+    for txn_date in dates:
+        month_key = (txn_date.year, txn_date.month)
+        roll = rng.random()
+
+        if month_key != last_salary_month:
+            # One salary per month into the primary bank account
+            last_salary_month = month_key
+            txn_type, amount = TransactionType.INCOME, round(monthly_salary, -2)
+            source, dest, category, description = None, banks[0], salary, "Salary Credit"
+        elif roll < 0.04:
+            txn_type, amount = TransactionType.INCOME, _amount(rng, 100, 20000)
+            category = rng.choice(income_cats)
+            source, dest, description = None, rng.choice(banks + cash), category.name
+        elif roll < 0.10 and cards:
+            card = rng.choice(cards)
+            txn_type, category = TransactionType.TRANSFER, None
+            amount = round(max(balances[card.id], 500.0) * rng.uniform(0.5, 1.0), 2)
+            source, dest, description = rng.choice(banks), card, f"{card.name} Bill Payment"
+        else:
+            txn_type = TransactionType.EXPENSE
+            category = rng.choice(expense_cats)
+            merchants, (low, high) = MERCHANTS.get(category.name, (["Local Store"], (100, 3000)))
+            amount = _amount(rng, low, high)
+            # Pay from wherever the money is: cash for small amounts, else bank or card
+            affordable = [
+                a for a in spend_from
+                if a.type == AccountType.CREDIT_CARD or balances[a.id] >= amount
+            ] or spend_from
+            source, dest, description = rng.choice(affordable), None, rng.choice(merchants)
+
+        _apply(balances, txn_type, amount, source, dest)
+        created = datetime.combine(txn_date, datetime.min.time()) + timedelta(seconds=rng.randrange(86400))
+        rows.append({
+            "user_id": user_id,
+            "type": txn_type,
+            "amount": amount,
+            "date": txn_date,
+            "description": description,
+            "notes": rng.choice(["", "", "", "paid via UPI", "split with friends", "reimbursable"]),
+            "category_id": category.id if category else None,
+            "source_account_id": source.id if source else None,
+            "dest_account_id": dest.id if dest else None,
+            "created_at": created,
+            "updated_at": created
+        })
+    return rows
+
+
+def _budget_rows(rng, user_id, categories, now) -> list:
+    rows = []
+    expense_cats = [c for c in categories if c.type == CategoryType.EXPENSE]
+    for back in range(3):
+        month = (now.month - back - 1) % 12 + 1
+        year = now.year - (1 if now.month - back < 1 else 0)
+        for category in rng.sample(expense_cats, min(5, len(expense_cats))):
+            rows.append({
+                "user_id": user_id, "category_id": category.id,
+                "amount": float(rng.choice([2000, 5000, 8000, 10000, 15000, 25000])),
+                "month": month, "year": year
+            })
+    return rows
+
+
+def _update_balances(db: Session, balances: dict, card_ids: set):
+    accounts = Account.__table__
+    by_id = accounts.c.id == bindparam("account_id")
+    bank_rows = [{"account_id": i, "value": v} for i, v in balances.items() if i not in card_ids]
+    card_rows = [{"account_id": i, "value": v} for i, v in balances.items() if i in card_ids]
+    if bank_rows:
+        db.execute(update(accounts).where(by_id).values(current_balance=bindparam("value")), bank_rows)
+    if card_rows:
+        db.execute(update(accounts).where(by_id).values(used_amount=bindparam("value")), card_rows)
+
+
+def generate(users: int, transactions: int, days: int = 730, prefix: str = "loadtest_",
+             password: str = "loadtest", seed: int = 42, batch_users: int = 50):
+    """Generate `users` users with `transactions` transactions each"""
+    create_all_tables()
+    rng = random.Random(seed)
+    now = datetime.now()
+    password_hash = hash_password(password)  # bcrypt is slow: hash once, share it
+
+    db = SessionLocal()
+    try:
+        existing = set(db.scalars(select(User.user_id).where(User.user_id.like(f"{prefix}%"))))
+        usernames = [f"{prefix}{i:05d}" for i in range(users)]
+        usernames = [u for u in usernames if u not in existing]
+        if existing:
+            print(f"✓ Skipping {users - len(usernames)} users that already exist")
+
+        started = time.perf_counter()
+        total_txns = 0
+        for batch in _chunks(usernames, batch_users):
+            _bulk_insert(db, User, [{
+                "user_id": username,
+                "password_hash": password_hash,
+                "role": UserRole.USER,
+                "name": username.replace("_", " ").title(),
+                "email": f"{username}@example.com",
+                "is_active": True,
+                "must_change_password": False
+            } for username in batch])
+            user_ids = list(db.scalars(select(User.id).where(User.user_id.in_(batch))))
+
+            _bulk_insert(db, Account, [row for uid in user_ids for row in _account_rows(rng, uid)])
+            _bulk_insert(db, Category, [row for uid in user_ids for row in _category_rows(rng, uid)])
+            accounts = _ids_by_user(db, Account, user_ids)
+            categories = _ids_by_user(db, Category, user_ids)
+
+            txn_rows, budget_rows, balances = [], [], {}
+            for uid in user_ids:
+                balances.update(db.execute(
+                    select(Account.id, Account.current_balance).where(Account.user_id == uid)
+                ).all())
+                for acc in accounts[uid]:
+                    if acc.type == AccountType.CREDIT_CARD:
+                        balances[acc.id] = 0.0
+                txn_rows += _transaction_rows(rng, uid, accounts[uid], categories[uid], transactions, days, balances, now)
+                budget_rows += _budget_rows(rng, uid, categories[uid], now)
+
+            _bulk_insert(db, Transaction, txn_rows)
+            _bulk_insert(db, Budget, budget_rows)
+
+            # Final balances replayed from the generated history
+            card_ids = {acc.id for uid in user_ids for acc in accounts[uid] if acc.type == AccountType.CREDIT_CARD}
+            _update_balances(db, balances, card_ids)
+
+            db.commit()
+            total_txns += len(txn_rows)
+            print(f"✓ {len(batch)} users, {len(txn_rows)} transactions ({time.perf_counter() - started:.1f}s)")
+
+        print(f"\n✅ Generated {len(usernames)} users and {total_txns} transactions")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic users and transactions")
+    parser.add_argument("--users", type=int, default=10, help="number of users to create")
+    parser.add_argument("--transactions", type=int, default=1000, help="transactions per user")
+    parser.add_argument("--days", type=int, default=730, help="history length in days")
+    parser.add_argument("--prefix", default="loadtest_", help="username prefix")
+    parser.add_argument("--password", default="loadtest", help="password for every generated user")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (output is reproducible)")
+    args = parser.parse_args()
+
+    generate(args.users, args.transactions, days=args.days, prefix=args.prefix,
+             password=args.password, seed=args.seed)
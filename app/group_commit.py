@@ -0,0 +1,156 @@
+"""
+Group commit for write-heavy SQLite deployments (``WRITE_BATCHING_ENABLED``).
+
+On SQLite every write transaction ends in its own fsync, and concurrent
+writers queue on the database lock, so each commit pays the full disk
+round-trip. With batching on, writes submitted through ``run`` go to one
+writer thread per shard. The writer takes up to ``WRITE_BATCH_SIZE`` queued
+writes (waiting at most ``WRITE_BATCH_WAIT_MS`` for more to arrive) and runs
+them in a single transaction. Each write gets its own SAVEPOINT, so a failing
+write is rolled back alone and only its request sees the error. The group
+then commits once, with one fsync for all of them.
+
+Code that runs both ways ends its writes with ``commit(db, after)`` instead
+of ``db.commit()``. That commits straight away on a normal session. On the
+writer's session it leaves the commit to the group and runs ``after`` (cache
+invalidation, notifications) once the group has committed.
+"""
+import asyncio
+import queue
+import threading
+import time
+
+from app.config import settings
+from app.database import SessionLocal
+
+# Session info key holding the post-commit callbacks of a group
+AFTER_COMMIT = "group_commit_after"
+
+
+def commit(db, after=None):
+    """Commit `db` and then call `after`, or defer both to the group commit"""
+    callbacks = db.info.get(AFTER_COMMIT)
+    if callbacks is None:
+        db.commit()
+        if after:
+            after()
+    elif after:
+        callbacks.append(after)
+
+
+class _Write:
+    """A queued write and the future of the request waiting on it"""
+    __slots__ = ("fn", "loop", "future")
+
+    def __init__(self, fn, loop, future):
+        self.fn = fn
+        self.loop = loop
+        self.future = future
+
+    def resolve(self, result=None, error=None):
+        """Complete the request's future (called from the writer thread)"""
+        def complete():
+            if self.future.cancelled():
+                return
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+
+        self.loop.call_soon_threadsafe(complete)
+
+
+class GroupCommitWriter:
+    """Single writer thread for one shard, committing queued writes in groups"""
+
+    def __init__(self, shard: int):
+        self.shard = shard
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=f"group-commit-{shard}", daemon=True).start()
+
+    def submit(self, fn) -> asyncio.Future:
+        """Queue `fn(db)`; the returned future resolves once its group has committed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Write(fn, loop, future))
+        return future
+
+    def _run(self):
+        while True:
+            writes = [self._queue.get()]
+            deadline = time.monotonic() + settings.WRITE_BATCH_WAIT_MS / 1000
+            while len(writes) < settings.WRITE_BATCH_SIZE:
+                try:
+                    writes.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            self._commit_group(writes)
+
+    def _commit_group(self, writes: list):
+        # Objects stay readable after commit: requests render what they wrote
+        db = SessionLocal(info={"shard": self.shard, AFTER_COMMIT: []}, expire_on_commit=False)
+        callbacks = db.info[AFTER_COMMIT]
+        results = []
+        failed = set()
+        try:
+            if db.get_bind().dialect.name == "sqlite":
+                # pysqlite would otherwise let the first SAVEPOINT start (and its
+                # RELEASE commit) the transaction; IMMEDIATE also takes the write lock
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for write in writes:
+                registered = len(callbacks)
+                try:
+                    with db.begin_nested():
+                        result = write.fn(db)
+                except Exception as e:
+                    del callbacks[registered:]
+                    failed.add(write)
+                    write.resolve(error=e)
+                else:
+                    results.append((write, result))
+            db.commit()
+        except Exception as e:
+            # Nothing was committed: fail every write that hasn't had its answer
+            # yet, including those never run (e.g. "database is locked" on BEGIN)
+            try:
+                db.rollback()
+            finally:
+                for write in writes:
+                    if write not in failed:
+                        write.resolve(error=e)
+            return
+        finally:
+            db.close()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:  # the writes are committed whatever happens here
+                print(f"⚠️  Post-commit callback failed: {e}")
+        for write, result in results:
+            write.resolve(result=result)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _writer(shard: int) -> GroupCommitWriter:
+    with _writers_lock:
+        if shard not in _writers:
+            _writers[shard] = GroupCommitWriter(shard)
+        return _writers[shard]
+
+
+async def run(db, fn):
+    """Run `fn(session)` as one write and return its result.
+
+    With batching on, `fn` runs on the shard's writer and is committed with
+    other queued writes; otherwise it runs on `db` (which `fn` commits).
+    """
+    if not settings.WRITE_BATCHING_ENABLED:
+        return fn(db)
+    # End the request's (read-only) transaction so its pooled connection is
+    # free for the writer while the request waits
+    db.rollback()
+    return await _writer(db.info.get("shard", 0)).submit(fn)
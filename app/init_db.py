@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from app.database import Base, engine, SessionLocal
+from app.database import SessionLocal, create_all_tables
 from app.models import User, Category, UserRole, CategoryType
 from app.auth import hash_password
 
@@ -93,7 +93,7 @@ def init_database():
     print("Initializing database...")
     
     # Create all tables
-    Base.metadata.create_all(bind=engine)
+    create_all_tables()
     print("✓ Database tables created")
     
     # Create default data
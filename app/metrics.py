@@ -0,0 +1,172 @@
+"""
+Prometheus metrics.
+
+- HTTP: latency histogram, status counts and in-flight gauge per route template
+- Database: statement timings, queries/DB time per request, pooled
+  connections in use
+- Caches: hit/miss counters (SQLAlchemy statement cache + app caches via
+  ``observe_cache``)
+
+Exposed in the Prometheus text format at ``/metrics``.
+"""
+import time
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"]
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by status code",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"]
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Duration of individual SQL statements",
+    ["operation"],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5)
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Number of SQL statements issued per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total SQL time spent per HTTP request",
+    ["route"]
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Pooled database connections currently checked out"
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result",
+    ["cache", "result"]
+)
+
+
+class RequestDBStats:
+    """SQL statements issued while serving the current request"""
+    __slots__ = ("queries", "duration")
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+
+_request_db_stats: ContextVar = ContextVar("request_db_stats", default=None)
+
+
+def observe_cache(cache: str, hit: bool):
+    """Record a cache lookup so its hit rate shows up in /metrics"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def route_template(scope) -> str:
+    """Route path template (e.g. /accounts/{account_id}/update) for labels"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def render_metrics():
+    """Body and content type for the /metrics endpoint"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route HTTP and SQL metrics"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            _request_db_stats.reset(token)
+
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method=method, route=route).observe(elapsed)
+            REQUESTS_TOTAL.labels(method=method, route=route, status=str(status_code)).inc()
+            DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route=route).observe(stats.duration)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _handle_error(context):
+    """A failed statement never reaches after_cursor_execute: drop its start time"""
+    starts = context.connection.info.get("metrics_query_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    operation = statement.lstrip().split(" ", 1)[0].upper() or "OTHER"
+    DB_QUERY_LATENCY.labels(operation=operation).observe(elapsed)
+
+    if context is not None and context.cache_hit in (CacheStats.CACHE_HIT, CacheStats.CACHE_MISS):
+        observe_cache("sqlalchemy_statement", context.cache_hit == CacheStats.CACHE_HIT)
+
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.duration += elapsed
+
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_IN_USE.inc()
+
+
+def _checkin(dbapi_connection, connection_record):
+    DB_POOL_IN_USE.dec()
+
+
+def instrument_engine(engine):
+    """Attach SQL and pool metrics to an engine (only when METRICS_ENABLED)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine.pool, "checkout", _checkout)
+    event.listen(engine.pool, "checkin", _checkin)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Enum, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -52,6 +52,7 @@ class User(Base):
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (Index("ix_accounts_user_change_seq", "user_id", "change_seq"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -72,6 +73,7 @@ class Account(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(Integer)  # Last change, for delta sync (see app/sync.py)
     
     # Relationships
     user = relationship("User", back_populates="accounts")
@@ -81,6 +83,7 @@ class Account(Base):
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (Index("ix_categories_user_change_seq", "user_id", "change_seq"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -89,6 +92,7 @@ class Category(Base):
     is_system = Column(Boolean, default=False)  # System categories can't be deleted
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    change_seq = Column(Integer)  # Last change, for delta sync (see app/sync.py)
     
     # Relationships
     user = relationship("User", back_populates="categories")
@@ -98,6 +102,12 @@ class Category(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_user_change_seq", "user_id", "change_seq"),
+        # Never hand out an id again once its row is deleted: archived rows
+        # (app/archive.py) keep their ids outside this table
+        {"sqlite_autoincrement": True}
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -116,6 +126,7 @@ class Transaction(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(Integer)  # Last change, for delta sync (see app/sync.py)
     
     # Relationships
     user = relationship("User", back_populates="transactions")
@@ -126,6 +137,7 @@ class Transaction(Base):
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (Index("ix_budgets_user_change_seq", "user_id", "change_seq"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -137,7 +149,35 @@ class Budget(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(Integer)  # Last change, for delta sync (see app/sync.py)
     
     # Relationships
     user = relationship("User", back_populates="budgets")
     category = relationship("Category", back_populates="budgets")
+
+
+class CardCycle(Base):
+    __tablename__ = "card_cycles"
+    __table_args__ = (UniqueConstraint("account_id", "cycle_start"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False, index=True)
+    
+    cycle_start = Column(Date, nullable=False)
+    cycle_end = Column(Date, nullable=False)  # Statement (billing) date
+    due_date = Column(Date)
+    
+    spend = Column(Float, default=0.0)  # Expenses charged in the cycle
+    payments = Column(Float, default=0.0)  # Transfers paid into the card
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NetWorthSnapshot(Base):
+    __tablename__ = "net_worth_snapshots"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    net_worth = Column(Float, nullable=False)  # At the end of the day
+
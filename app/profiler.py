@@ -0,0 +1,143 @@
+"""
+Opt-in per-request SQL profiler (SQL_PROFILER_ENABLED=true).
+
+Records every statement a request issues with its timing and parameters,
+logs statements slower than SQL_SLOW_QUERY_MS, and flags statement shapes
+that run more than SQL_N_PLUS_ONE_THRESHOLD times in one request as likely
+N+1 lazy loads. Each response carries a summary in the ``X-SQL-Profile`` and
+``Server-Timing`` headers; the full report goes to the ``app.profiler`` log.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,?)+\)", re.IGNORECASE)
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so repeats with different values compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    return _IN_LIST.sub("IN (?)", shape)
+
+
+class QueryRecord:
+    __slots__ = ("statement", "parameters", "duration")
+
+    def __init__(self, statement, parameters, duration):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+
+
+class RequestProfile:
+    """All statements issued while serving one request"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.queries = []
+
+    @property
+    def total_time(self) -> float:
+        return sum(q.duration for q in self.queries)
+
+    def repeated_shapes(self, threshold: int) -> list:
+        """(shape, count) pairs seen more than `threshold` times, worst first"""
+        counts = Counter(statement_shape(q.statement) for q in self.queries)
+        return [(shape, n) for shape, n in counts.most_common() if n > threshold]
+
+    def summary_header(self, threshold: int) -> str:
+        return "queries={}; time={:.1f}ms; n_plus_one={}".format(
+            len(self.queries),
+            self.total_time * 1000,
+            len(self.repeated_shapes(threshold))
+        )
+
+    def report(self, threshold: int) -> str:
+        lines = [f"{self.method} {self.path}: {self.summary_header(threshold)}"]
+        for q in self.queries:
+            lines.append(f"  {q.duration * 1000:8.2f}ms  {_WHITESPACE.sub(' ', q.statement)}  {q.parameters!r}")
+        for shape, count in self.repeated_shapes(threshold):
+            lines.append(f"  possible N+1 ({count}x): {shape}")
+        return "\n".join(lines)
+
+
+_current_profile: ContextVar = ContextVar("sql_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profiler_query_start"].pop()
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1fms): %s params=%r",
+            elapsed * 1000, _WHITESPACE.sub(" ", statement), parameters
+        )
+
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.queries.append(QueryRecord(statement, parameters, elapsed))
+
+
+def attach_profiler(engine):
+    """Hook the profiler into an engine's statement execution"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[sql-profiler] %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware collecting a RequestProfile per HTTP request"""
+
+    def __init__(self, app, threshold: int = None):
+        self.app = app
+        self.threshold = settings.SQL_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-sql-profile", profile.summary_header(self.threshold).encode()))
+                headers.append((
+                    b"server-timing",
+                    'db;dur={:.2f};desc="{} queries"'.format(profile.total_time * 1000, len(profile.queries)).encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            repeated = profile.repeated_shapes(self.threshold)
+            for shape, count in repeated:
+                logger.warning("Possible N+1 on %s %s: %dx %s", profile.method, profile.path, count, shape)
+            logger.info(profile.report(self.threshold))
@@ -0,0 +1,49 @@
+"""
+Bulk user provisioning from a CSV file.
+
+The CSV needs ``user_id``, ``password`` and ``name`` columns and may have
+``email`` and ``role`` (``user`` or ``admin``). Users are created in
+set-based batches with their default categories; existing usernames are
+skipped.
+
+    python -m app.provision_users users.csv
+"""
+import argparse
+import csv
+import time
+
+from app.database import SessionLocal, create_all_tables
+from app.services.user_service import UserService
+
+
+def provision_from_csv(path: str, must_change_password: bool = True):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+
+    users = [row for row in rows if row.get("user_id") and row.get("password") and row.get("name")]
+    if len(users) < len(rows):
+        print(f"⚠️  Ignoring {len(rows) - len(users)} rows without user_id, password or name")
+
+    create_all_tables()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        created, skipped = UserService.provision_users(db, users, must_change_password)
+        if skipped:
+            print(f"✓ Skipped {len(skipped)} users that already exist")
+        print(f"\n✅ Created {len(created)} users ({time.perf_counter() - started:.1f}s)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create users in bulk from a CSV file")
+    parser.add_argument("csv_path", help="CSV with user_id, password, name[, email, role] columns")
+    parser.add_argument("--no-password-change", action="store_true",
+                        help="don't force users to change their password on first login")
+    args = parser.parse_args()
+
+    provision_from_csv(args.csv_path, must_change_password=not args.no_password_change)
@@ -0,0 +1,144 @@
+"""
+Prebuilt statements for the queries nearly every request runs.
+
+Building a ``db.query(...)`` chain costs Python time on every call: the
+clause objects are constructed again and SQLAlchemy has to walk them to find
+the compiled-statement cache key. The statements here are built once, with
+``bindparam`` placeholders for the values, so a call only binds parameters
+and hits the compiled cache directly.
+
+Month filters are date ranges (``date >= first day AND date < next month``)
+rather than ``extract()``, so they can use an index on the date. A range
+that reaches archived years (see ``app/archive.py``) builds the same
+statement over the archive-inclusive source instead of the prebuilt one.
+"""
+from datetime import date
+
+from sqlalchemy import bindparam, func, select
+
+from app import archive
+from app.models import User, Account, Transaction, Category, Budget, TransactionType
+
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+
+def _in_range(txn) -> tuple:
+    """One user's transactions of one type in [start, end)"""
+    return (
+        txn.user_id == bindparam("user_id"),
+        txn.type == bindparam("type"),
+        txn.date >= bindparam("start"),
+        txn.date < bindparam("end")
+    )
+
+
+def _total(txn):
+    return select(func.coalesce(func.sum(txn.amount), 0.0)).where(*_in_range(txn))
+
+
+def _total_by_category(txn):
+    return select(txn.category_id, func.sum(txn.amount)).where(*_in_range(txn)).group_by(txn.category_id)
+
+
+def _amounts(txn):
+    return select(txn.date, txn.amount).where(*_in_range(txn))
+
+
+def _by_category_name(txn):
+    return select(
+        Category.name, func.sum(txn.amount)
+    ).join(
+        txn, txn.category_id == Category.id
+    ).where(*_in_range(txn)).group_by(Category.name)
+
+
+def _by_account_type(txn):
+    return select(
+        Account.type, func.sum(txn.amount)
+    ).join(
+        txn, txn.source_account_id == Account.id
+    ).where(*_in_range(txn)).group_by(Account.type)
+
+
+TRANSACTION_TOTAL = _total(Transaction)
+TRANSACTION_TOTAL_BY_CATEGORY = _total_by_category(Transaction)
+TRANSACTION_AMOUNTS = _amounts(Transaction)
+EXPENSE_BY_CATEGORY_NAME = _by_category_name(Transaction)
+EXPENSE_BY_ACCOUNT_TYPE = _by_account_type(Transaction)
+
+BUDGETS_FOR_MONTH = select(Budget).where(
+    Budget.user_id == bindparam("user_id"),
+    Budget.month == bindparam("month"),
+    Budget.year == bindparam("year")
+)
+
+# (model, fields) -> SELECT of those columns for one user, ordered by id
+_owned_rows = {}
+
+
+def month_range(month: int, year: int) -> tuple:
+    """First day of the month and first day of the next"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _for_range(db, prebuilt, build, start: date, end: date):
+    """`prebuilt`, or `build` over the archive too when [start, end) reaches it"""
+    txn = archive.transaction_source(db, start, end)
+    return prebuilt if txn is Transaction else build(txn)
+
+
+def user_by_id(db, user_id: int):
+    return db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
+
+
+def owned_rows(db, model, fields: tuple, user_id: int) -> list:
+    """`fields` of every `model` row belonging to the user, ordered by id"""
+    statement = _owned_rows.get((model, fields))
+    if statement is None:
+        statement = _owned_rows[(model, fields)] = select(
+            *(getattr(model, field) for field in fields)
+        ).where(model.user_id == bindparam("user_id")).order_by(model.id)
+    return db.execute(statement, {"user_id": user_id}).all()
+
+
+def transaction_total(db, user_id: int, txn_type: TransactionType, start: date, end: date) -> float:
+    """Sum of the user's `txn_type` transactions dated in [start, end)"""
+    return db.execute(_for_range(db, TRANSACTION_TOTAL, _total, start, end), {
+        "user_id": user_id, "type": txn_type, "start": start, "end": end
+    }).scalar()
+
+
+def transaction_totals_by_category(db, user_id: int, txn_type: TransactionType, start: date, end: date) -> dict:
+    """category id -> sum of the user's `txn_type` transactions dated in [start, end)"""
+    return dict(db.execute(_for_range(db, TRANSACTION_TOTAL_BY_CATEGORY, _total_by_category, start, end), {
+        "user_id": user_id, "type": txn_type, "start": start, "end": end
+    }).all())
+
+
+def transaction_amounts(db, user_id: int, txn_type: TransactionType, start: date, end: date) -> list:
+    """(date, amount) of the user's `txn_type` transactions dated in [start, end)"""
+    return db.execute(_for_range(db, TRANSACTION_AMOUNTS, _amounts, start, end), {
+        "user_id": user_id, "type": txn_type, "start": start, "end": end
+    }).all()
+
+
+def expense_by_category_name(db, user_id: int, start: date, end: date) -> list:
+    """(category name, total) of the user's expenses dated in [start, end)"""
+    return db.execute(_for_range(db, EXPENSE_BY_CATEGORY_NAME, _by_category_name, start, end), {
+        "user_id": user_id, "type": TransactionType.EXPENSE, "start": start, "end": end
+    }).all()
+
+
+def expense_by_account_type(db, user_id: int, start: date, end: date) -> list:
+    """(account type, total) of the user's expenses dated in [start, end), by paying account"""
+    return db.execute(_for_range(db, EXPENSE_BY_ACCOUNT_TYPE, _by_account_type, start, end), {
+        "user_id": user_id, "type": TransactionType.EXPENSE, "start": start, "end": end
+    }).all()
+
+
+def budgets_for_month(db, user_id: int, month: int, year: int) -> list:
+    return db.execute(BUDGETS_FOR_MONTH, {
+        "user_id": user_id, "month": month, "year": year
+    }).scalars().all()
@@ -2,23 +2,34 @@ from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Account, AccountType
 from app.auth import get_current_user
-from datetime import datetime
+from app.services.deletion_service import DeletionService
+from app.services.statement_service import StatementService
+from app.services.card_cycle_service import CardCycleService
+from app.services.net_worth_service import NetWorthService
+from app.services.reference_service import ReferenceService
+from app.config import settings
+from app.assets import asset_url
+from app.fragments import wants_fragment, fragment_response, render, insert_before, remove
+from app import events
+from datetime import datetime, date
+import math
 
 router = APIRouter(prefix="/accounts")
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals.update(asset_url=asset_url)
 
 
 @router.get("", response_class=HTMLResponse)
-async def list_accounts(request: Request, db: Session = Depends(get_db)):
+async def list_accounts(request: Request, db: Session = Depends(get_read_db)):
     """List all user accounts"""
     user = get_current_user(request, db)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
-    accounts = db.query(Account).filter(Account.user_id == user.id).all()
+    accounts = ReferenceService.accounts(db, user.id)
     
     # Separate by type
     bank_accounts = [a for a in accounts if a.type == AccountType.BANK]
@@ -34,6 +45,72 @@ async def list_accounts(request: Request, db: Session = Depends(get_db)):
     })
 
 
+@router.get("/cards", response_class=HTMLResponse)
+async def credit_cards(request: Request, db: Session = Depends(get_read_db)):
+    """Credit card billing cycles: current cycle, last statement and history"""
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    cards = ReferenceService.accounts(db, user.id, AccountType.CREDIT_CARD)
+    summaries = CardCycleService.get_summaries(db, cards)
+    
+    return templates.TemplateResponse("accounts/cards.html", {
+        "request": request,
+        "user": user,
+        "summaries": [summaries[card.id] for card in cards],
+        "today": date.today()
+    })
+
+
+@router.get("/{account_id}/statement", response_class=HTMLResponse)
+async def account_statement(
+    request: Request,
+    account_id: int,
+    db: Session = Depends(get_read_db),
+    date_from: str = None,
+    date_to: str = None,
+    page: int = 1
+):
+    """Account statement with opening, running and closing balances"""
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    account = db.query(Account).filter(
+        Account.id == account_id,
+        Account.user_id == user.id
+    ).first()
+    if not account:
+        return RedirectResponse(url="/accounts", status_code=302)
+    
+    # Default to the current month; a date that doesn't parse falls back to it too
+    today = date.today()
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else today.replace(day=1)
+    except ValueError:
+        start = today.replace(day=1)
+    try:
+        end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else today
+    except ValueError:
+        end = today
+    
+    page = max(page, 1)
+    statement = StatementService.get_statement(db, account, start, end, page, settings.ITEMS_PER_PAGE)
+    total_pages = max(1, math.ceil(statement["entry_count"] / settings.ITEMS_PER_PAGE))
+    
+    return templates.TemplateResponse("accounts/statement.html", {
+        "request": request,
+        "user": user,
+        "account": account,
+        "date_from": start.isoformat(),
+        "date_to": end.isoformat(),
+        "page": page,
+        "total_pages": total_pages,
+        **statement
+    })
+
+
 @router.post("/create")
 async def create_account(
     request: Request,
@@ -73,7 +150,18 @@ async def create_account(
         account.current_balance = initial_balance
     
     db.add(account)
+    opening_balance = account.type != AccountType.CREDIT_CARD and account.current_balance
+    if opening_balance:
+        # Opening balances count from the start of the net-worth history
+        NetWorthService.record(db, user.id, None, account.current_balance)
     db.commit()
+    ReferenceService.invalidate(user.id)
+    if opening_balance:
+        events.publish(user.id, {"type": "account", "net_worth": account.current_balance})
+    
+    if wants_fragment(request):
+        card = render(templates, "accounts/_card.html", {"account": account})
+        return fragment_response(insert_before(f"add-{account.type.value}", card))
     
     return RedirectResponse(url="/accounts", status_code=302)
 
@@ -111,12 +199,17 @@ async def update_account(
     elif account.type == AccountType.CREDIT_CARD:
         if total_limit is not None:
             account.total_limit = total_limit
+        cycle_days = (account.billing_date, account.due_date)
         if billing_date is not None:
             account.billing_date = billing_date
         if due_date is not None:
             account.due_date = due_date
+        if (account.billing_date, account.due_date) != cycle_days:
+            # Cycle boundaries moved: regroup the card's history
+            CardCycleService.rebuild(db, account)
     
     db.commit()
+    ReferenceService.invalidate(user.id)
     
     return JSONResponse({"success": True})
 
@@ -138,7 +231,11 @@ async def delete_account(
     ).first()
     
     if account:
-        db.delete(account)
-        db.commit()
+        DeletionService.delete_account(db, account)
+        # Its transactions are gone too, so every aggregate may have moved
+        events.publish(user.id, {"type": "resync"})
+    
+    if wants_fragment(request):
+        return fragment_response(remove(f"account-{account_id}"))
     
     return RedirectResponse(url="/accounts", status_code=302)
@@ -1,47 +1,105 @@
-from fastapi import APIRouter, Request, Depends, Form
+from fastapi import APIRouter, Request, Depends, Form, UploadFile, File, BackgroundTasks
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import User, UserRole, Account, Transaction, Category
+from sqlalchemy import func, case, or_
+from app.database import get_db, fan_out
+from app import archive
+from app.models import User, UserRole, Account
 from app.auth import get_current_user, hash_password
+from app.services.user_service import UserService
+from app.services.deletion_service import DeletionService
+from app.assets import asset_url
+from app.config import settings
 from datetime import datetime
+from urllib.parse import urlencode
+import csv
+import io
+import math
 
 router = APIRouter(prefix="/admin")
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals.update(asset_url=asset_url)
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def admin_dashboard(request: Request, db: Session = Depends(get_db), success: str = None, error: str = None):
+async def admin_dashboard(
+    request: Request,
+    db: Session = Depends(get_db),
+    success: str = None,
+    error: str = None,
+    search: str = None,
+    page: int = 1
+):
     """Admin dashboard"""
     user = get_current_user(request, db)
     if not user or user.role != UserRole.ADMIN:
         return RedirectResponse(url="/login", status_code=302)
     
-    # Get all users
-    users = db.query(User).all()
-    
     # System stats
-    total_users = len(users)
-    active_users = sum(1 for u in users if u.is_active)
-    total_accounts = db.query(Account).count()
-    total_transactions = db.query(Transaction).count()
+    total_users, active_users = db.query(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active == True, 1), else_=0)), 0)
+    ).one()
+    # Per-user tables are sharded: count on every shard in parallel
+    total_accounts = sum(fan_out(lambda shard_db: shard_db.query(Account).count()))
+    # Archived years included (see app/archive.py)
+    total_transactions = sum(fan_out(
+        lambda shard_db: shard_db.query(func.count()).select_from(archive.transaction_source(shard_db)).scalar()
+    ))
+    
+    # One page of users, filtered server-side
+    query = db.query(User)
+    if search:
+        query = query.filter(
+            or_(
+                User.user_id.ilike(f"%{search}%"),
+                User.name.ilike(f"%{search}%"),
+                User.email.ilike(f"%{search}%")
+            )
+        )
+    matching_users = query.count()
+    total_pages = max(1, math.ceil(matching_users / settings.ITEMS_PER_PAGE))
+    page = min(max(page, 1), total_pages)
+    users = query.order_by(User.id).offset((page - 1) * settings.ITEMS_PER_PAGE).limit(settings.ITEMS_PER_PAGE).all()
+    
+    # Transaction count and last activity for the page's users: one grouped query per shard
+    user_ids = [u.id for u in users]
+    activity = {}
+    if user_ids:
+        def page_activity(shard_db):
+            txn = archive.transaction_source(shard_db)
+            return shard_db.query(
+                txn.user_id,
+                func.count(txn.id),
+                func.max(txn.created_at)
+            ).filter(txn.user_id.in_(user_ids)).group_by(txn.user_id).all()
+        
+        for rows in fan_out(page_activity):
+            for user_id, count, last_activity in rows:
+                activity[user_id] = (count, last_activity)
     
     return templates.TemplateResponse("admin/dashboard.html", {
         "request": request,
         "user": user,
         "users": users,
+        "activity": activity,
         "total_users": total_users,
         "active_users": active_users,
         "total_accounts": total_accounts,
         "total_transactions": total_transactions,
+        "search": search or "",
+        "page": page,
+        "total_pages": total_pages,
+        "matching_users": matching_users,
         "success": success,
         "error": error
     })
 
 
 @router.post("/users/create")
-async def create_user(
+def create_user(
     request: Request,
     user_id: str = Form(...),
     password: str = Form(...),
@@ -63,36 +121,15 @@ async def create_user(
             status_code=302
         )
     
-    # Create user
-    new_user = User(
-        user_id=user_id,
-        password_hash=hash_password(password),
-        role=UserRole.ADMIN if role == "admin" else UserRole.USER,
-        name=name,
-        email=email,
-        is_active=True,
-        must_change_password=True
-    )
-    db.add(new_user)
-    db.commit()
-    
-    # Create default categories for new user
-    admin = db.query(User).filter(User.user_id == "adminExpense").first()
-    if admin:
-        admin_categories = db.query(Category).filter(
-            Category.user_id == admin.id,
-            Category.is_system == True
-        ).all()
-        
-        for cat in admin_categories:
-            user_cat = Category(
-                user_id=new_user.id,
-                name=cat.name,
-                type=cat.type,
-                is_system=True
-            )
-            db.add(user_cat)
-        db.commit()
+    # Create user with the default categories (this route is a plain def, so
+    # FastAPI runs it in its threadpool and bcrypt doesn't block the event loop)
+    UserService.provision_users(db, [{
+        "user_id": user_id,
+        "password": password,
+        "name": name,
+        "email": email,
+        "role": role
+    }])
     
     return RedirectResponse(
         url="/admin/dashboard?success=User created successfully",
@@ -100,6 +137,37 @@ async def create_user(
     )
 
 
+@router.post("/users/bulk-create")
+async def bulk_create_users(
+    request: Request,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """Create users from a CSV with user_id, password, name, email, role columns"""
+    admin_user = get_current_user(request, db)
+    if not admin_user or admin_user.role != UserRole.ADMIN:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    try:
+        rows = list(csv.DictReader(io.StringIO((await file.read()).decode("utf-8-sig"))))
+    except UnicodeDecodeError:
+        return RedirectResponse(url="/admin/dashboard?error=File must be a UTF-8 CSV", status_code=302)
+    
+    users = [row for row in rows if row.get("user_id") and row.get("password") and row.get("name")]
+    if not users:
+        return RedirectResponse(
+            url="/admin/dashboard?error=No valid rows (user_id, password and name are required)",
+            status_code=302
+        )
+    
+    # Hashing thousands of passwords must not stall the event loop
+    created, skipped = await run_in_threadpool(UserService.provision_users, db, users)
+    message = f"Created {len(created)} users"
+    if skipped or len(users) < len(rows):
+        message += f", skipped {len(skipped) + len(rows) - len(users)}"
+    return RedirectResponse(url="/admin/dashboard?" + urlencode({"success": message}), status_code=302)
+
+
 @router.post("/users/{user_id}/toggle-status")
 async def toggle_user_status(
     request: Request,
@@ -111,10 +179,15 @@ async def toggle_user_status(
     if not admin_user or admin_user.role != UserRole.ADMIN:
         return JSONResponse({"error": "Unauthorized"}, status_code=403)
     
+    # Disabling yourself would end your own session
+    if admin_user.id == user_id:
+        return JSONResponse({"error": "Cannot disable your own account"}, status_code=400)
+    
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return JSONResponse({"error": "User not found"}, status_code=404)
     
+    # Disabling takes effect on the user's next request (see get_current_user)
     user.is_active = not user.is_active
     db.commit()
     
@@ -128,6 +201,7 @@ async def toggle_user_status(
 async def delete_user(
     request: Request,
     user_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Delete user"""
@@ -143,12 +217,16 @@ async def delete_user(
         )
     
     user = db.query(User).filter(User.id == user_id).first()
-    if user:
-        db.delete(user)
-        db.commit()
+    if not user:
+        return RedirectResponse(url="/admin/dashboard?error=User not found", status_code=302)
+    
+    # Lock the user out now; their data is removed in chunks after the response
+    user.is_active = False
+    db.commit()
+    background_tasks.add_task(DeletionService.delete_user, user_id)
     
     return RedirectResponse(
-        url="/admin/dashboard?success=User deleted successfully",
+        url="/admin/dashboard?success=User deletion started",
         status_code=302
     )
 
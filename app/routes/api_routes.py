@@ -0,0 +1,166 @@
+from fastapi import APIRouter, Request, Depends
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.models import Transaction, Budget, AccountType, CategoryType, TransactionType
+from app.services.reference_service import AccountRef, CategoryRef, ReferenceService
+from app.serialization import FastJSONResponse
+from app import archive
+from datetime import datetime, date
+
+router = APIRouter(prefix="/api/v1")
+
+MAX_PER_PAGE = 500
+
+# Fields each resource exposes; `fields=` picks a subset
+TRANSACTION_FIELDS = {
+    column.key: column for column in Transaction.__table__.columns
+    if column.key not in ("user_id", "receipt_path", "change_seq")
+}
+BUDGET_FIELDS = {
+    column.key: column for column in Budget.__table__.columns
+    if column.key not in ("user_id", "change_seq")
+}
+ACCOUNT_FIELDS = [name for name in AccountRef._fields if name != "user_id"]
+CATEGORY_FIELDS = [name for name in CategoryRef._fields if name != "user_id"]
+
+
+def _fields(requested: str, available) -> list:
+    """Field names from a comma-separated `fields=` value (all fields when empty)"""
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+    return list(dict.fromkeys(names))
+
+
+def _error(message: str, status_code: int) -> FastJSONResponse:
+    return FastJSONResponse({"error": message}, status_code=status_code)
+
+
+def _refs(refs, names: list) -> list:
+    """Cached reference tuples as dicts of the requested fields"""
+    return [{name: getattr(ref, name) for name in names} for ref in refs]
+
+
+@router.get("/transactions")
+async def api_transactions(
+    request: Request,
+    fields: str = "",
+    type: str = None,
+    account_id: int = None,
+    category_id: int = None,
+    start_date: str = None,
+    end_date: str = None,
+    page: int = 1,
+    per_page: int = 100,
+    db: Session = Depends(get_read_db)
+):
+    """Transactions, newest first, with only the requested columns"""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return _error("Unauthorized", 401)
+    
+    try:
+        names = _fields(fields, TRANSACTION_FIELDS)
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        txn_type = TransactionType(type) if type else None
+    except ValueError as e:
+        return _error(str(e), 400)
+    
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    # Archived years are only read when the date range reaches them
+    txn = archive.transaction_source(db, start, end)
+    query = select(*(getattr(txn, name) for name in names)).where(txn.user_id == user_id)
+    if txn_type:
+        query = query.where(txn.type == txn_type)
+    if account_id:
+        query = query.where(or_(
+            txn.source_account_id == account_id,
+            txn.dest_account_id == account_id
+        ))
+    if category_id:
+        query = query.where(txn.category_id == category_id)
+    if start:
+        query = query.where(txn.date >= start)
+    if end:
+        query = query.where(txn.date <= end)
+    
+    # One extra row tells whether there is another page
+    rows = db.execute(
+        query.order_by(txn.date.desc(), txn.id.desc())
+        .offset((page - 1) * per_page).limit(per_page + 1)
+    ).all()
+    return FastJSONResponse({
+        "data": [dict(zip(names, row)) for row in rows[:per_page]],
+        "page": page,
+        "per_page": per_page,
+        "has_more": len(rows) > per_page
+    })
+
+
+@router.get("/budgets")
+async def api_budgets(
+    request: Request,
+    fields: str = "",
+    month: int = None,
+    year: int = None,
+    db: Session = Depends(get_read_db)
+):
+    """Budgets for a month (default: the current one)"""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return _error("Unauthorized", 401)
+    
+    try:
+        names = _fields(fields, BUDGET_FIELDS)
+    except ValueError as e:
+        return _error(str(e), 400)
+    
+    today = date.today()
+    rows = db.execute(
+        select(*(BUDGET_FIELDS[name] for name in names)).where(
+            Budget.user_id == user_id,
+            Budget.month == (month or today.month),
+            Budget.year == (year or today.year)
+        ).order_by(Budget.id)
+    ).all()
+    return FastJSONResponse({"data": [dict(zip(names, row)) for row in rows]})
+
+
+@router.get("/accounts")
+async def api_accounts(request: Request, fields: str = "", type: str = None, db: Session = Depends(get_read_db)):
+    """Accounts, from the per-user reference cache"""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return _error("Unauthorized", 401)
+    
+    try:
+        names = _fields(fields, ACCOUNT_FIELDS)
+        account_type = AccountType(type) if type else None
+    except ValueError as e:
+        return _error(str(e), 400)
+    
+    accounts = ReferenceService.accounts(db, user_id, account_type)
+    return FastJSONResponse({"data": _refs(accounts, names)})
+
+
+@router.get("/categories")
+async def api_categories(request: Request, fields: str = "", type: str = None, db: Session = Depends(get_read_db)):
+    """Categories, from the per-user reference cache"""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return _error("Unauthorized", 401)
+    
+    try:
+        names = _fields(fields, CATEGORY_FIELDS)
+        category_type = CategoryType(type) if type else None
+    except ValueError as e:
+        return _error(str(e), 400)
+    
+    categories = ReferenceService.categories(db, user_id, category_type)
+    return FastJSONResponse({"data": _refs(categories, names)})
@@ -5,9 +5,11 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User
 from app.auth import verify_password, hash_password, get_current_user
+from app.assets import asset_url
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals.update(asset_url=asset_url)
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -2,18 +2,31 @@ from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Budget, Category
+from app.database import get_db, get_read_db
+from app.models import Budget, Category, CategoryType
 from app.auth import get_current_user
 from app.services.analytics_service import AnalyticsService
+from app.services.reference_service import ReferenceService
+from app.assets import asset_url
+from app.fragments import wants_fragment, fragment_response, render, replace, prepend, remove
+from app import events
 from datetime import datetime
 
 router = APIRouter(prefix="/budgets")
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals.update(asset_url=asset_url)
+
+
+def _budget_event(budget: Budget, amount: float = None):
+    """Live-update event for a current-month budget (amount None: removed)"""
+    now = datetime.now()
+    if (budget.month, budget.year) != (now.month, now.year):
+        return None
+    return {"type": "budget", "category_id": budget.category_id, "budget": amount}
 
 
 @router.get("", response_class=HTMLResponse)
-async def list_budgets(request: Request, db: Session = Depends(get_db)):
+async def list_budgets(request: Request, db: Session = Depends(get_read_db)):
     """List budgets with spending comparison"""
     user = get_current_user(request, db)
     if not user:
@@ -31,10 +44,7 @@ async def list_budgets(request: Request, db: Session = Depends(get_db)):
     budget_status = AnalyticsService.get_budget_status(db, user.id)
     
     # Get categories for creating new budgets
-    expense_categories = db.query(Category).filter(
-        Category.user_id == user.id,
-        Category.type == "expense"
-    ).all()
+    expense_categories = ReferenceService.categories(db, user.id, CategoryType.EXPENSE)
     
     return templates.TemplateResponse("budgets/list.html", {
         "request": request,
@@ -73,6 +83,7 @@ async def create_budget(
         # Update existing
         existing.amount = amount
         db.commit()
+        budget = existing
     else:
         # Create new
         budget = Budget(
@@ -85,6 +96,22 @@ async def create_budget(
         db.add(budget)
         db.commit()
     
+    event = _budget_event(budget, amount)
+    if event:
+        events.publish(user.id, event)
+    
+    if wants_fragment(request):
+        # The page only shows the current month's budgets
+        now = datetime.now()
+        if (month, year) != (now.month, now.year):
+            return fragment_response()
+        card = render(templates, "budgets/_card.html", {
+            "status": AnalyticsService.get_budget_status(db, user.id, month, year, budget_id=budget.id)[0]
+        })
+        if existing:
+            return fragment_response(replace(f"budget-{budget.id}", card))
+        return fragment_response(remove("budgetsEmpty"), prepend("budgetCards", card))
+    
     return RedirectResponse(url="/budgets", status_code=302)
 
 
@@ -109,7 +136,10 @@ async def update_budget(
         return JSONResponse({"error": "Budget not found"}, status_code=404)
     
     budget.amount = amount
+    event = _budget_event(budget, amount)
     db.commit()
+    if event:
+        events.publish(user.id, event)
     
     return JSONResponse({"success": True})
 
@@ -131,7 +161,13 @@ async def delete_budget(
     ).first()
     
     if budget:
+        event = _budget_event(budget)
         db.delete(budget)
         db.commit()
+        if event:
+            events.publish(user.id, event)
+    
+    if wants_fragment(request):
+        return fragment_response(remove(f"budget-{budget_id}"))
     
     return RedirectResponse(url="/budgets", status_code=302)
@@ -2,22 +2,26 @@ from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Category, CategoryType
 from app.auth import get_current_user
+from app.services.user_service import UserService, ADMIN_USER_ID
+from app.services.reference_service import ReferenceService
+from app.assets import asset_url
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals.update(asset_url=asset_url)
 
 
 @router.get("/settings/categories", response_class=HTMLResponse)
-async def categories_settings(request: Request, db: Session = Depends(get_db)):
+async def categories_settings(request: Request, db: Session = Depends(get_read_db)):
     """Category management page"""
     user = get_current_user(request, db)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
-    categories = db.query(Category).filter(Category.user_id == user.id).all()
+    categories = ReferenceService.categories(db, user.id)
     
     income_categories = [c for c in categories if c.type == CategoryType.INCOME]
     expense_categories = [c for c in categories if c.type == CategoryType.EXPENSE]
@@ -50,6 +54,7 @@ async def create_category(
     )
     db.add(category)
     db.commit()
+    ReferenceService.invalidate(user.id)
     
     return RedirectResponse(url="/settings/categories", status_code=302)
 
@@ -76,6 +81,11 @@ async def update_category(
     
     category.name = name
     db.commit()
+    ReferenceService.invalidate(user.id)
+    
+    # The admin's system categories are the template for new users
+    if category.is_system and user.user_id == ADMIN_USER_ID:
+        UserService.invalidate_category_template()
     
     return JSONResponse({"success": True})
 
@@ -99,5 +109,6 @@ async def delete_category(
     if category and not category.is_system:
         db.delete(category)
         db.commit()
+        ReferenceService.invalidate(user.id)
     
     return RedirectResponse(url="/settings/categories", status_code=302)
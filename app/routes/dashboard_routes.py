@@ -1,21 +1,29 @@
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from app.database import get_db
+from app.database import get_read_db
 from app.models import User, Account, Transaction, Category, AccountType
 from app.auth import get_current_user
 from app.services.analytics_service import AnalyticsService
+from app.services.card_cycle_service import CardCycleService
+from app.services.net_worth_service import NetWorthService, GRANULARITIES, MAX_POINTS
+from app.services.reference_service import ReferenceService
+from app.projections import TransactionRow, columns, rows
+from app.assets import asset_url
+from app.config import settings
+from app.events import broker, format_sse
 from datetime import datetime
+import asyncio
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
-templates.env.globals.update(now=datetime.now)
+templates.env.globals.update(now=datetime.now, asset_url=asset_url)
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def dashboard(request: Request, db: Session = Depends(get_db), success: str = None):
+async def dashboard(request: Request, db: Session = Depends(get_read_db), success: str = None):
     """Main user dashboard"""
     user = get_current_user(request, db)
     if not user:
@@ -31,32 +39,27 @@ async def dashboard(request: Request, db: Session = Depends(get_db), success: st
     monthly_expense = AnalyticsService.get_monthly_expense(db, user.id)
     
     # Get recent transactions
-    recent_transactions = db.query(Transaction).filter(
+    recent_transactions = list(rows(db.query(*columns(TransactionRow, Transaction)).filter(
         Transaction.user_id == user.id
-    ).order_by(desc(Transaction.date), desc(Transaction.created_at)).limit(5).all()
+    ).order_by(desc(Transaction.date), desc(Transaction.created_at)).limit(5), TransactionRow))
     
     # Get budget status
     budget_status = AnalyticsService.get_budget_status(db, user.id)
     
-    # Get upcoming credit card payments
-    now = datetime.now()
-    current_day = now.day
-    credit_cards = db.query(Account).filter(
-        Account.user_id == user.id,
-        Account.type == AccountType.CREDIT_CARD
-    ).all()
+    # Get upcoming credit card payments from the precomputed billing cycles
+    today = datetime.now().date()
+    credit_cards = ReferenceService.accounts(db, user.id, AccountType.CREDIT_CARD)
     
     upcoming_payments = []
-    for cc in credit_cards:
-        if cc.due_date and cc.used_amount > 0:
-            days_until_due = cc.due_date - current_day
-            if days_until_due < 0:
-                days_until_due += 30  # Rough estimate for next month
-            
+    for summary in CardCycleService.get_summaries(db, credit_cards, today).values():
+        statement = summary["statement"]
+        if statement and statement["due_date"] and statement["remaining_due"] > 0:
+            days_until_due = (statement["due_date"] - today).days
             upcoming_payments.append({
-                'card_name': cc.name,
-                'amount': cc.used_amount,
-                'due_date': cc.due_date,
+                'card_name': summary["card"].name,
+                'amount': statement["remaining_due"],
+                'minimum_due': statement["remaining_minimum"],
+                'due_date': statement["due_date"],
                 'days_until_due': days_until_due,
                 'is_urgent': days_until_due <= 7
             })
@@ -65,8 +68,8 @@ async def dashboard(request: Request, db: Session = Depends(get_db), success: st
     upcoming_payments.sort(key=lambda x: x['days_until_due'])
 
     # Get accounts and categories for modal
-    accounts = db.query(Account).filter(Account.user_id == user.id).all()
-    categories = db.query(Category).filter(Category.user_id == user.id).all()
+    accounts = ReferenceService.accounts(db, user.id)
+    categories = ReferenceService.categories(db, user.id)
     
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
@@ -79,12 +82,45 @@ async def dashboard(request: Request, db: Session = Depends(get_db), success: st
         "upcoming_payments": upcoming_payments,
         "accounts": accounts,
         "categories": categories,
+        "account_names": ReferenceService.names(accounts),
+        "category_names": ReferenceService.names(categories),
         "success": success
     })
 
 
+@router.get("/events")
+async def live_events(request: Request):
+    """Server-Sent Events stream of the user's balance and budget changes"""
+    # Session only: a stream stays open for minutes, so it must not hold a DB session
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+    
+    queue = broker.subscribe(user_id)
+    
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/api/analytics/expense-breakdown")
-async def expense_breakdown(request: Request, db: Session = Depends(get_db)):
+async def expense_breakdown(request: Request, db: Session = Depends(get_read_db)):
     """API endpoint for expense breakdown chart data"""
     user = get_current_user(request, db)
     if not user:
@@ -99,7 +135,7 @@ async def expense_breakdown(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/api/analytics/trend")
-async def weekly_trend(request: Request, db: Session = Depends(get_db)):
+async def weekly_trend(request: Request, db: Session = Depends(get_read_db)):
     """API endpoint for weekly spending trend"""
     user = get_current_user(request, db)
     if not user:
@@ -114,7 +150,7 @@ async def weekly_trend(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/api/analytics/income-vs-expense")
-async def income_vs_expense(request: Request, db: Session = Depends(get_db)):
+async def income_vs_expense(request: Request, db: Session = Depends(get_read_db)):
     """API endpoint for income vs expense trend"""
     user = get_current_user(request, db)
     if not user:
@@ -130,7 +166,7 @@ async def income_vs_expense(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/api/analytics/payment-mode")
-async def payment_mode_breakdown(request: Request, db: Session = Depends(get_db)):
+async def payment_mode_breakdown(request: Request, db: Session = Depends(get_read_db)):
     """API endpoint for payment mode breakdown"""
     user = get_current_user(request, db)
     if not user:
@@ -142,3 +178,34 @@ async def payment_mode_breakdown(request: Request, db: Session = Depends(get_db)
         "labels": list(data.keys()),
         "values": list(data.values())
     })
+
+
+@router.get("/api/analytics/net-worth")
+async def net_worth_history(
+    request: Request,
+    start: str = None,
+    end: str = None,
+    granularity: str = "auto",
+    points: int = MAX_POINTS,
+    db: Session = Depends(get_read_db)
+):
+    """API endpoint for net worth over time (daily snapshots, downsampled for long ranges)"""
+    user = get_current_user(request, db)
+    if not user:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    if granularity != "auto" and granularity not in GRANULARITIES:
+        return JSONResponse({"error": f"granularity must be one of auto, {', '.join(GRANULARITIES)}"}, status_code=400)
+    try:
+        start_day = datetime.strptime(start, "%Y-%m-%d").date() if start else None
+        end_day = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    
+    # Read-only: writes keep the snapshots current
+    data = NetWorthService.get_series(
+        db, user.id, start_day, end_day, granularity, max(1, min(points, MAX_POINTS))
+    )
+    
+    return JSONResponse(data)
+
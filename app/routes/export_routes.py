@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import StreamingResponse, RedirectResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Transaction
+from app.database import get_read_db
 from app.auth import get_current_user
+from app.services.reference_service import ReferenceService
+from app.projections import TransactionExportRow, columns, rows
+from app import archive
 import pandas as pd
 import io
 from datetime import datetime
@@ -11,43 +13,51 @@ from datetime import datetime
 router = APIRouter(prefix="/export")
 
 
-@router.get("/csv")
-async def export_csv(
-    request: Request,
-    db: Session = Depends(get_db),
-    date_from: str = None,
-    date_to: str = None
-):
-    """Export transactions as CSV"""
-    user = get_current_user(request, db)
-    if not user:
-        return RedirectResponse(url="/login", status_code=302)
+def _export_rows(db: Session, user_id: int, date_from: str = None, date_to: str = None) -> list:
+    """Export rows, newest first, from column tuples and cached account/category names"""
+    start = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
+    end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
     
-    # Get transactions
-    query = db.query(Transaction).filter(Transaction.user_id == user.id)
+    # Includes archived years only when the range reaches them
+    txn = archive.transaction_source(db, start, end)
+    query = db.query(*columns(TransactionExportRow, txn)).filter(txn.user_id == user_id)
     
-    if date_from:
-        query = query.filter(Transaction.date >= datetime.strptime(date_from, "%Y-%m-%d").date())
-    if date_to:
-        query = query.filter(Transaction.date <= datetime.strptime(date_to, "%Y-%m-%d").date())
+    if start:
+        query = query.filter(txn.date >= start)
+    if end:
+        query = query.filter(txn.date <= end)
     
-    transactions = query.order_by(Transaction.date.desc()).all()
+    account_names = ReferenceService.names(ReferenceService.accounts(db, user_id))
+    category_names = ReferenceService.names(ReferenceService.categories(db, user_id))
     
-    # Convert to DataFrame
     data = []
-    for txn in transactions:
+    for txn in rows(query.order_by(txn.date.desc()), TransactionExportRow):
         data.append({
             'Date': txn.date.strftime('%Y-%m-%d'),
             'Type': txn.type.value,
             'Amount': txn.amount,
             'Description': txn.description or '',
-            'Category': txn.category.name if txn.category else '',
-            'Source Account': txn.source_account.name if txn.source_account else '',
-            'Destination Account': txn.dest_account.name if txn.dest_account else '',
+            'Category': category_names.get(txn.category_id, ''),
+            'Source Account': account_names.get(txn.source_account_id, ''),
+            'Destination Account': account_names.get(txn.dest_account_id, ''),
             'Notes': txn.notes or ''
         })
+    return data
+
+
+@router.get("/csv")
+async def export_csv(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    date_from: str = None,
+    date_to: str = None
+):
+    """Export transactions as CSV"""
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse(url="/login", status_code=302)
     
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(_export_rows(db, user.id, date_from, date_to))
     
     # Create CSV in memory
     output = io.StringIO()
@@ -67,7 +77,7 @@ async def export_csv(
 @router.get("/excel")
 async def export_excel(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     date_from: str = None,
     date_to: str = None
 ):
@@ -76,31 +86,7 @@ async def export_excel(
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
-    # Get transactions
-    query = db.query(Transaction).filter(Transaction.user_id == user.id)
-    
-    if date_from:
-        query = query.filter(Transaction.date >= datetime.strptime(date_from, "%Y-%m-%d").date())
-    if date_to:
-        query = query.filter(Transaction.date <= datetime.strptime(date_to, "%Y-%m-%d").date())
-    
-    transactions = query.order_by(Transaction.date.desc()).all()
-    
-    # Convert to DataFrame
-    data = []
-    for txn in transactions:
-        data.append({
-            'Date': txn.date.strftime('%Y-%m-%d'),
-            'Type': txn.type.value,
-            'Amount': txn.amount,
-            'Description': txn.description or '',
-            'Category': txn.category.name if txn.category else '',
-            'Source Account': txn.source_account.name if txn.source_account else '',
-            'Destination Account': txn.dest_account.name if txn.dest_account else '',
-            'Notes': txn.notes or ''
-        })
-    
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(_export_rows(db, user.id, date_from, date_to))
     
     # Create Excel in memory
     output = io.BytesIO()
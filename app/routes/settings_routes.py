@@ -4,9 +4,11 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth import get_current_user
+from app.assets import asset_url
 
 router = APIRouter(prefix="/settings")
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals.update(asset_url=asset_url)
 
 @router.get("", response_class=HTMLResponse)
 async def general_settings(request: Request, db: Session = Depends(get_db)):
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.services.sync_service import SyncService
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/sync")
+async def sync_changes(request: Request, since: int = 0, db: Session = Depends(get_read_db)):
+    """Accounts, categories, budgets and transactions changed since cursor `since`"""
+    # Session only, so an up-to-date client costs a single cursor lookup
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    return JSONResponse(SyncService.changes(db, user_id, max(since, 0)))
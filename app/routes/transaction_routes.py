@@ -3,24 +3,45 @@ from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Transaction, Account, Category, TransactionType
 from app.auth import get_current_user
 from app.services.transaction_service import TransactionService
+from app.services.suggestion_service import SuggestionService
+from app.services.reference_service import ReferenceService
+from app.search import ranked_matches
+from app.projections import TransactionRow, columns, rows
+from app import archive, group_commit
 from app.config import settings
+from app.assets import asset_url
+from app.streaming import stream_template, STREAM_FLUSH
+from app.fragments import wants_fragment, fragment_response, render, prepend, remove
 from datetime import datetime, date
 import os
 import uuid
 
 router = APIRouter(prefix="/transactions")
+api_router = APIRouter(prefix="/api/transactions")
 templates = Jinja2Templates(directory="app/templates")
-templates.env.globals.update(now=datetime.now)
+templates.env.globals.update(now=datetime.now, asset_url=asset_url, stream_flush=STREAM_FLUSH)
+
+
+def _find_transaction(db: Session, user_id: int, transaction_id: int):
+    """The user's transaction, moved back from the archive first if it was archived"""
+    query = db.query(Transaction).filter(
+        Transaction.id == transaction_id,
+        Transaction.user_id == user_id
+    )
+    transaction = query.first()
+    if transaction is None and archive.restore(db, user_id, transaction_id):
+        transaction = query.first()
+    return transaction
 
 
 @router.get("", response_class=HTMLResponse)
 async def list_transactions(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     search: str = None,
     category_id: int = None,
     account_id: int = None,
@@ -33,51 +54,67 @@ async def list_transactions(
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
-    # Base query
-    query = db.query(Transaction).filter(Transaction.user_id == user.id)
+    start = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
+    end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
+    
+    # Base query: only the columns the list shows, as read-only tuples.
+    # Archived years are only read when the date range reaches them.
+    txn = archive.transaction_source(db, start, end)
+    query = db.query(*columns(TransactionRow, txn)).filter(txn.user_id == user.id)
     
-    # Apply filters
-    if search:
+    # Apply filters: ranked full-text search where the database supports it
+    # (archived rows aren't in the index, so ranges reaching them use ILIKE)
+    ranked = ranked_matches(db, Transaction, search, user.id) if search and txn is Transaction else None
+    if ranked is not None:
+        query = query.join(ranked, ranked.c.id == Transaction.id)
+    elif search:
         query = query.filter(
             or_(
-                Transaction.description.ilike(f"%{search}%"),
-                Transaction.notes.ilike(f"%{search}%")
+                txn.description.ilike(f"%{search}%"),
+                txn.notes.ilike(f"%{search}%")
             )
         )
     
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        query = query.filter(txn.category_id == category_id)
     
     if account_id:
         query = query.filter(
             or_(
-                Transaction.source_account_id == account_id,
-                Transaction.dest_account_id == account_id
+                txn.source_account_id == account_id,
+                txn.dest_account_id == account_id
             )
         )
     
     if type:
-        query = query.filter(Transaction.type == type)
+        query = query.filter(txn.type == type)
     
-    if date_from:
-        query = query.filter(Transaction.date >= datetime.strptime(date_from, "%Y-%m-%d").date())
+    if start:
+        query = query.filter(txn.date >= start)
     
-    if date_to:
-        query = query.filter(Transaction.date <= datetime.strptime(date_to, "%Y-%m-%d").date())
+    if end:
+        query = query.filter(txn.date <= end)
     
-    # Order by date descending
-    transactions = query.order_by(Transaction.date.desc(), Transaction.created_at.desc()).all()
+    # Best matches first when searching, otherwise by date descending.
+    # Rows are read in batches while the page streams out.
+    if ranked is not None:
+        query = query.order_by(ranked.c.rank)
+    transactions = rows(query.order_by(
+        txn.date.desc(), txn.created_at.desc()
+    ).yield_per(settings.STREAM_BATCH_SIZE), TransactionRow)
     
     # Get accounts and categories for filters
-    accounts = db.query(Account).filter(Account.user_id == user.id).all()
-    categories = db.query(Category).filter(Category.user_id == user.id).all()
+    accounts = ReferenceService.accounts(db, user.id)
+    categories = ReferenceService.categories(db, user.id)
     
-    return templates.TemplateResponse("transactions/list.html", {
+    return stream_template(templates, "transactions/list.html", {
         "request": request,
         "user": user,
         "transactions": transactions,
         "accounts": accounts,
         "categories": categories,
+        "account_names": ReferenceService.names(accounts),
+        "category_names": ReferenceService.names(categories),
         "search": search or "",
         "selected_category": category_id,
         "selected_account": account_id,
@@ -127,8 +164,28 @@ async def create_transaction(
         "receipt_path": None
     }
     
-    # Create transaction and update balances
-    TransactionService.create_transaction(db, transaction_data, user.id)
+    # Names for the new row, read up front: with batching on, nothing after
+    # the write should need a database connection
+    user_id = user.id
+    if wants_fragment(request):
+        account_names = ReferenceService.names(ReferenceService.accounts(db, user_id))
+        category_names = ReferenceService.names(ReferenceService.categories(db, user_id))
+    
+    # Create transaction and update balances (group-committed when batching is on)
+    try:
+        transaction = await group_commit.run(
+            db, lambda write_db: TransactionService.create_transaction(write_db, transaction_data, user_id)
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    
+    if wants_fragment(request):
+        row = render(templates, "transactions/_row.html", {
+            "txn": transaction,
+            "account_names": account_names,
+            "category_names": category_names
+        })
+        return fragment_response(remove("transactionsEmpty"), prepend("transactionRows", row))
     
     return RedirectResponse(url="/transactions", status_code=302)
 
@@ -149,10 +206,7 @@ async def update_transaction(
     if not user:
         return JSONResponse({"error": "Unauthorized"}, status_code=401)
     
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == user.id
-    ).first()
+    transaction = _find_transaction(db, user.id, transaction_id)
     
     if not transaction:
         return JSONResponse({"error": "Transaction not found"}, status_code=404)
@@ -186,13 +240,24 @@ async def delete_transaction(
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == user.id
-    ).first()
+    transaction = _find_transaction(db, user.id, transaction_id)
     
     if transaction:
         # Delete transaction and revert balances
         TransactionService.delete_transaction(db, transaction)
     
+    if wants_fragment(request):
+        return fragment_response(remove(f"txn-{transaction_id}"))
+    
     return RedirectResponse(url="/transactions", status_code=302)
+
+
+@api_router.get("/suggest")
+async def suggest_descriptions(request: Request, q: str = "", limit: int = 8):
+    """Past descriptions starting with `q`, from the in-memory index (no database query)"""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    suggestions = SuggestionService.suggest(user_id, q, limit=min(max(limit, 1), 20))
+    return JSONResponse({"suggestions": suggestions})
@@ -0,0 +1,128 @@
+"""
+Full-text search over transaction descriptions and notes.
+
+- SQLite: an external-content FTS5 table (``transactions_fts``) kept in sync
+  by triggers on ``transactions``
+- PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index
+
+Both are maintained by the database itself, so ORM writes, bulk inserts and
+set-based deletes all stay in sync. Searches match every word as a prefix
+and are ranked by relevance (bm25 / ts_rank). Other databases fall back to
+ILIKE.
+
+The index is created (and filled) on startup; to rebuild it by hand:
+
+    python -m app.search rebuild
+"""
+import argparse
+import re
+
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.exc import OperationalError
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_SETUP = [
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description, notes) VALUES (new.id, new.description, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description, notes)
+        VALUES ('delete', old.id, old.description, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description, notes ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description, notes)
+        VALUES ('delete', old.id, old.description, old.notes);
+        INSERT INTO transactions_fts(rowid, description, notes) VALUES (new.id, new.description, new.notes);
+    END""",
+]
+
+POSTGRES_SETUP = [
+    """ALTER TABLE transactions ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(notes, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_search_vector ON transactions USING GIN (search_vector)",
+]
+
+# Dialects whose search index is in place (replicas share their primary's schema)
+_indexed = set()
+
+fts_table = table("transactions_fts", column("rowid"))
+
+
+def install(engine, rebuild: bool = False):
+    """Create the search index on an engine if missing, filling it when new"""
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'"
+                )).first()
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+                    "description, notes, content='transactions', content_rowid='id', "
+                    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                ))
+                for statement in SQLITE_SETUP:
+                    conn.execute(text(statement))
+                if rebuild or not exists:
+                    conn.execute(text("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')"))
+            elif dialect == "postgresql":
+                # The generated column fills itself, including for existing rows
+                for statement in POSTGRES_SETUP:
+                    conn.execute(text(statement))
+            else:
+                return
+    except OperationalError as e:  # e.g. SQLite built without FTS5
+        print(f"⚠️  Full-text search unavailable, using ILIKE: {e}")
+        return
+    _indexed.add(dialect)
+
+
+def _terms(search: str) -> list:
+    return _WORD.findall(search.lower())
+
+
+def ranked_matches(db, model, search: str, user_id: int):
+    """Subquery of (id, rank) for the user's rows matching `search`, best rank lowest.
+
+    Returns None when the search can't use the index (no words in it, or no
+    index on this database); callers then fall back to ILIKE.
+    """
+    terms = _terms(search)
+    bind = db.get_bind(model.__mapper__)
+    if not terms or bind.dialect.name not in _indexed:
+        return None
+
+    if bind.dialect.name == "sqlite":
+        # Every word must match, each as a prefix: "swig"* "ord"*
+        query = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        return select(
+            fts_table.c.rowid.label("id"),
+            func.bm25(literal_column("transactions_fts")).label("rank")
+        ).select_from(fts_table).join(
+            model.__table__, model.id == fts_table.c.rowid
+        ).where(
+            literal_column("transactions_fts").op("MATCH")(query),
+            model.user_id == user_id
+        ).subquery()
+
+    tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+    vector = literal_column("transactions.search_vector")
+    return select(
+        model.id.label("id"),
+        (-func.ts_rank(vector, tsquery)).label("rank")
+    ).where(vector.op("@@")(tsquery), model.user_id == user_id).subquery()
+
+
+if __name__ == "__main__":
+    from app.database import shard_engines
+
+    parser = argparse.ArgumentParser(description="Manage the transaction full-text search index")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: (re)create and refill the index on every shard")
+    args = parser.parse_args()
+
+    for shard, engine in enumerate(shard_engines):
+        install(engine, rebuild=True)
+        print(f"✓ Shard {shard}: search index {'rebuilt' if engine.dialect.name in _indexed else 'unavailable'}")
+    print("\n✅ Done")
@@ -0,0 +1,35 @@
+"""
+Fast JSON responses for the read API.
+
+``FastJSONResponse`` serialises with orjson when it is installed -- it handles
+dates, datetimes and enums natively and is several times faster than the
+standard library on large row lists -- and falls back to ``json`` otherwise.
+Content is expected to be plain dicts/lists built from row tuples, not ORM
+objects.
+"""
+import json
+from datetime import date, datetime
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from app.models import Transaction, Account, Budget, Category, AccountType, TransactionType
+from app.models import AccountType, TransactionType
+from app import repository
 from datetime import datetime, timedelta
 from collections import defaultdict
+from app.services.reference_service import ReferenceService
 
 
 class AnalyticsService:
@@ -11,7 +12,7 @@ class AnalyticsService:
     @staticmethod
     def calculate_net_worth(db: Session, user_id: int) -> float:
         """Calculate total net worth (Banks + Cash - CC Debt)"""
-        accounts = db.query(Account).filter(Account.user_id == user_id).all()
+        accounts = ReferenceService.accounts(db, user_id)
         
         total = 0.0
         for account in accounts:
@@ -30,14 +31,8 @@ class AnalyticsService:
             month = now.month
             year = now.year
         
-        total = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == TransactionType.INCOME,
-            extract('month', Transaction.date) == month,
-            extract('year', Transaction.date) == year
-        ).scalar()
-        
-        return total or 0.0
+        start, end = repository.month_range(month, year)
+        return repository.transaction_total(db, user_id, TransactionType.INCOME, start, end)
     
     @staticmethod
     def get_monthly_expense(db: Session, user_id: int, month: int = None, year: int = None) -> float:
@@ -47,14 +42,8 @@ class AnalyticsService:
             month = now.month
             year = now.year
         
-        total = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == TransactionType.EXPENSE,
-            extract('month', Transaction.date) == month,
-            extract('year', Transaction.date) == year
-        ).scalar()
-        
-        return total or 0.0
+        start, end = repository.month_range(month, year)
+        return repository.transaction_total(db, user_id, TransactionType.EXPENSE, start, end)
     
     @staticmethod
     def get_expense_by_category(db: Session, user_id: int, month: int = None, year: int = None) -> dict:
@@ -64,17 +53,7 @@ class AnalyticsService:
             month = now.month
             year = now.year
         
-        results = db.query(
-            Category.name,
-            func.sum(Transaction.amount).label('total')
-        ).join(
-            Transaction, Transaction.category_id == Category.id
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == TransactionType.EXPENSE,
-            extract('month', Transaction.date) == month,
-            extract('year', Transaction.date) == year
-        ).group_by(Category.name).all()
+        results = repository.expense_by_category_name(db, user_id, *repository.month_range(month, year))
         
         return {name: float(total) for name, total in results}
     
@@ -84,18 +63,16 @@ class AnalyticsService:
         end_date = datetime.now().date()
         start_date = end_date - timedelta(weeks=weeks)
         
-        transactions = db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == TransactionType.EXPENSE,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date
-        ).all()
+        # Just (date, amount) tuples: no entities to build or track
+        transactions = repository.transaction_amounts(
+            db, user_id, TransactionType.EXPENSE, start_date, end_date + timedelta(days=1)
+        )
         
         # Group by week
         weekly_data = defaultdict(float)
-        for txn in transactions:
-            week_start = txn.date - timedelta(days=txn.date.weekday())
-            weekly_data[week_start] += txn.amount
+        for txn_date, amount in transactions:
+            week_start = txn_date - timedelta(days=txn_date.weekday())
+            weekly_data[week_start] += amount
         
         # Format for chart
         result = []
@@ -138,17 +115,7 @@ class AnalyticsService:
             month = now.month
             year = now.year
         
-        results = db.query(
-            Account.type,
-            func.sum(Transaction.amount).label('total')
-        ).join(
-            Transaction, Transaction.source_account_id == Account.id
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == TransactionType.EXPENSE,
-            extract('month', Transaction.date) == month,
-            extract('year', Transaction.date) == year
-        ).group_by(Account.type).all()
+        results = repository.expense_by_account_type(db, user_id, *repository.month_range(month, year))
         
         mode_map = {
             AccountType.BANK: "Bank",
@@ -159,32 +126,33 @@ class AnalyticsService:
         return {mode_map.get(acc_type, str(acc_type)): float(total) for acc_type, total in results}
     
     @staticmethod
-    def get_budget_status(db: Session, user_id: int, month: int = None, year: int = None) -> list:
-        """Get budget vs actual spending for current month"""
+    def get_budget_status(db: Session, user_id: int, month: int = None, year: int = None,
+                          budget_id: int = None) -> list:
+        """Get budget vs actual spending for current month (or just one budget)"""
         if month is None or year is None:
             now = datetime.now()
             month = now.month
             year = now.year
         
-        budgets = db.query(Budget).filter(
-            Budget.user_id == user_id,
-            Budget.month == month,
-            Budget.year == year
-        ).all()
-        
+        budgets = repository.budgets_for_month(db, user_id, month, year)
+        if budget_id:
+            budgets = [budget for budget in budgets if budget.id == budget_id]
+        if not budgets:
+            return []
+        
+        category_names = ReferenceService.names(ReferenceService.categories(db, user_id))
+        # Actual spending for every category in one grouped query
+        spending = repository.transaction_totals_by_category(
+            db, user_id, TransactionType.EXPENSE, *repository.month_range(month, year)
+        )
         result = []
         for budget in budgets:
-            # Get actual spending
-            spent = db.query(func.sum(Transaction.amount)).filter(
-                Transaction.user_id == user_id,
-                Transaction.type == TransactionType.EXPENSE,
-                Transaction.category_id == budget.category_id,
-                extract('month', Transaction.date) == month,
-                extract('year', Transaction.date) == year
-            ).scalar() or 0.0
+            spent = spending.get(budget.category_id) or 0.0
             
             result.append({
-                'category': budget.category.name,
+                'id': budget.id,
+                'category_id': budget.category_id,
+                'category': category_names.get(budget.category_id),
                 'budget': budget.amount,
                 'spent': spent,
                 'percentage': (spent / budget.amount * 100) if budget.amount > 0 else 0,
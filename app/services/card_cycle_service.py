@@ -0,0 +1,209 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from sqlalchemy import func, case, and_, or_
+from sqlalchemy.orm import Session
+from app import archive
+from app.models import CardCycle, Account, Transaction, TransactionType
+
+# Minimum due: a share of the statement balance, but at least a fixed floor
+MINIMUM_DUE_RATE = 0.05
+MINIMUM_DUE_FLOOR = 200.0
+
+
+def _day_in_month(year: int, month: int, day: int) -> date:
+    """`day` of the given month, clamped to its last day (e.g. 31 -> 28 Feb)"""
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+
+def _shift_month(year: int, month: int, months: int) -> tuple:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+class CardCycleService:
+    """Credit card billing cycles and their precomputed totals"""
+
+    @staticmethod
+    def cycle_for(card: Account, on: date) -> tuple:
+        """(cycle_start, cycle_end, due_date) of the billing cycle containing `on`.
+
+        A cycle ends on the billing day (month end when unset); payment is due
+        on the due day of the same month if it falls after the billing day,
+        otherwise of the next month.
+        """
+        billing_day = card.billing_date or 31
+        cycle_end = _day_in_month(on.year, on.month, billing_day)
+        if on > cycle_end:
+            year, month = _shift_month(on.year, on.month, 1)
+            cycle_end = _day_in_month(year, month, billing_day)
+
+        year, month = _shift_month(cycle_end.year, cycle_end.month, -1)
+        cycle_start = _day_in_month(year, month, billing_day) + timedelta(days=1)
+
+        due_date = None
+        if card.due_date:
+            year, month = cycle_end.year, cycle_end.month
+            if card.due_date <= billing_day:
+                year, month = _shift_month(year, month, 1)
+            due_date = _day_in_month(year, month, card.due_date)
+
+        return cycle_start, cycle_end, due_date
+
+    @staticmethod
+    def record(db: Session, card: Account, on: date, spend: float = 0.0, payments: float = 0.0):
+        """Add spend/payments to the cycle containing `on` (negative to revert)"""
+        cycle_start, cycle_end, due_date = CardCycleService.cycle_for(card, on)
+        cycle = db.query(CardCycle).filter(
+            CardCycle.account_id == card.id,
+            CardCycle.cycle_start == cycle_start
+        ).first()
+        if not cycle:
+            # Serialise backfills of the same card across concurrent writes
+            db.query(Account.id).filter(Account.id == card.id).with_for_update().scalar()
+            if not db.query(CardCycle.id).filter(CardCycle.account_id == card.id).first():
+                # No cycles tracked for this card yet. A charge or payment being
+                # applied is backfilled from the full history, which already
+                # holds it once flushed; one being reverted is left for then
+                if spend > 0 or payments > 0:
+                    db.flush()
+                    db.add_all(CardCycleService._build(db, card))
+                return
+            cycle = CardCycle(
+                user_id=card.user_id,
+                account_id=card.id,
+                cycle_start=cycle_start,
+                cycle_end=cycle_end,
+                due_date=due_date,
+                spend=0.0,
+                payments=0.0
+            )
+            db.add(cycle)
+        cycle.spend += spend
+        cycle.payments += payments
+
+    @staticmethod
+    def _card_activity(card: Account, txn=Transaction):
+        """Transactions that move a card's outstanding amount: charges and payments"""
+        return and_(
+            txn.user_id == card.user_id,
+            or_(
+                and_(txn.source_account_id == card.id, txn.type == TransactionType.EXPENSE),
+                and_(txn.dest_account_id == card.id, txn.type == TransactionType.TRANSFER)
+            )
+        )
+
+    @staticmethod
+    def _build(db: Session, card: Account) -> list:
+        """A card's cycles computed from its transactions, not added to the session"""
+        # The card's whole history, archived years included
+        txn = archive.transaction_source(db)
+        daily = db.query(
+            txn.date,
+            func.sum(case((txn.type == TransactionType.EXPENSE, txn.amount), else_=0.0)),
+            func.sum(case((txn.type == TransactionType.TRANSFER, txn.amount), else_=0.0))
+        ).filter(
+            CardCycleService._card_activity(card, txn)
+        ).group_by(txn.date).all()
+
+        cycles = {}
+        for day, spend, payments in daily:
+            cycle_start, cycle_end, due_date = CardCycleService.cycle_for(card, day)
+            if cycle_start not in cycles:
+                cycles[cycle_start] = CardCycle(
+                    user_id=card.user_id,
+                    account_id=card.id,
+                    cycle_start=cycle_start,
+                    cycle_end=cycle_end,
+                    due_date=due_date,
+                    spend=0.0,
+                    payments=0.0
+                )
+            cycles[cycle_start].spend += spend
+            cycles[cycle_start].payments += payments
+        return sorted(cycles.values(), key=lambda cycle: cycle.cycle_start)
+
+    @staticmethod
+    def rebuild(db: Session, card: Account):
+        """Recompute all of a card's cycles from its transactions in the caller's transaction"""
+        db.query(CardCycle).filter(CardCycle.account_id == card.id).delete(synchronize_session=False)
+        db.add_all(CardCycleService._build(db, card))
+
+    @staticmethod
+    def minimum_due(statement_balance: float) -> float:
+        if statement_balance <= 0:
+            return 0.0
+        return min(statement_balance, max(statement_balance * MINIMUM_DUE_RATE, MINIMUM_DUE_FLOOR))
+
+    @staticmethod
+    def get_summaries(db: Session, cards: list, today: date = None, months: int = 12) -> dict:
+        """Current cycle, last statement and recent history per card id, from the cycle totals"""
+        today = today or date.today()
+        if not cards:
+            return {}
+
+        rows = db.query(CardCycle).filter(
+            CardCycle.account_id.in_([card.id for card in cards])
+        ).order_by(CardCycle.account_id, CardCycle.cycle_start).all()
+        cycles_by_card = {}
+        for cycle in rows:
+            cycles_by_card.setdefault(cycle.account_id, []).append(cycle)
+
+        # Cards with no cycles yet (e.g. created before cycles were tracked)
+        # are computed from their history here and stored by their next write;
+        # reads never write, so this is safe on a replica
+        for card in cards:
+            if card.id not in cycles_by_card:
+                cycles_by_card[card.id] = CardCycleService._build(db, card)
+
+        summaries = {}
+        for card in cards:
+            current_start, current_end, _ = CardCycleService.cycle_for(card, today)
+            last_start, last_end, last_due = CardCycleService.cycle_for(card, current_start - timedelta(days=1))
+            current = {"start": current_start, "end": current_end, "spend": 0.0, "payments": 0.0}
+            statement = None
+            history = []
+            balance = 0.0
+            paid_since = 0.0
+
+            for cycle in cycles_by_card.get(card.id, []):
+                if cycle.cycle_end <= last_end:
+                    balance += cycle.spend - cycle.payments
+                    history.append({
+                        "start": cycle.cycle_start,
+                        "end": cycle.cycle_end,
+                        "spend": cycle.spend,
+                        "payments": cycle.payments,
+                        "balance": max(balance, 0.0)
+                    })
+                else:
+                    # Payments made after the statement date count towards it
+                    paid_since += cycle.payments
+                    if cycle.cycle_start == current_start:
+                        current["spend"] = cycle.spend
+                        current["payments"] = cycle.payments
+
+            if history:
+                # The last closed cycle, even if nothing was charged in it
+                last = history[-1] if history[-1]["start"] == last_start else {"spend": 0.0, "payments": 0.0}
+                statement_balance = max(balance, 0.0)
+                minimum_due = CardCycleService.minimum_due(statement_balance)
+                statement = {
+                    "start": last_start,
+                    "end": last_end,
+                    "due_date": last_due,
+                    "spend": last["spend"],
+                    "payments": last["payments"],
+                    "balance": statement_balance,
+                    "minimum_due": minimum_due,
+                    "paid_since": paid_since,
+                    "remaining_due": max(statement_balance - paid_since, 0.0),
+                    "remaining_minimum": max(minimum_due - paid_since, 0.0)
+                }
+
+            summaries[card.id] = {
+                "card": card,
+                "current": current,
+                "statement": statement,
+                "history": list(reversed(history[-months:]))
+            }
+        return summaries
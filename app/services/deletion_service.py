@@ -0,0 +1,118 @@
+from sqlalchemy import delete, select, update, or_
+from sqlalchemy.orm import Session
+from app.models import User, Account, Category, Transaction, Budget, CardCycle, NetWorthSnapshot
+from app import archive, sync
+from app.database import release_shard, session_for_user
+from app.services.suggestion_service import SuggestionService
+from app.services.reference_service import ReferenceService
+from app.services.net_worth_service import NetWorthService
+
+DELETE_BATCH_SIZE = 5000
+
+
+class DeletionService:
+    """Set-based deletes for users and accounts"""
+
+    @staticmethod
+    def _delete_in_chunks(db: Session, model, condition, sync_user_id: int = None) -> int:
+        """Delete matching rows DELETE_BATCH_SIZE at a time, committing each chunk.
+
+        With `sync_user_id`, tombstones are left for that user's sync clients.
+        """
+        deleted = 0
+        while True:
+            ids = db.scalars(select(model.id).where(condition).limit(DELETE_BATCH_SIZE)).all()
+            if not ids:
+                return deleted
+            db.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False})
+            if sync_user_id:
+                sync.record_deletes(db, sync_user_id, model.__tablename__, ids)
+            db.commit()
+            deleted += len(ids)
+
+    @staticmethod
+    def _delete_archived(db: Session, condition, sync_user_id: int = None) -> int:
+        """Delete archived transactions matching `condition(table)` from every archive year"""
+        deleted = 0
+        for table in archive.year_tables(db):
+            while True:
+                ids = db.scalars(select(table.c.id).where(condition(table)).limit(DELETE_BATCH_SIZE)).all()
+                if not ids:
+                    break
+                db.execute(delete(table).where(table.c.id.in_(ids)))
+                if sync_user_id:
+                    sync.record_deletes(db, sync_user_id, Transaction.__tablename__, ids)
+                db.commit()
+                deleted += len(ids)
+        return deleted
+
+    @staticmethod
+    def delete_account(db: Session, account: Account):
+        """Delete an account and the transactions that only involve it.
+
+        Transfers to or from another account are kept with this side cleared:
+        the other account's balance already reflects them, so its history and
+        balance stay consistent.
+        """
+        account_id, user_id = account.id, account.user_id
+        seq = sync.next_seq(db, user_id)
+        for table in [Transaction.__table__] + archive.year_tables(db):
+            db.execute(
+                update(table).where(
+                    table.c.source_account_id == account_id,
+                    table.c.dest_account_id.isnot(None),
+                    table.c.dest_account_id != account_id
+                ).values(source_account_id=None, change_seq=seq),
+                execution_options={"synchronize_session": False}
+            )
+            db.execute(
+                update(table).where(
+                    table.c.dest_account_id == account_id,
+                    table.c.source_account_id.isnot(None),
+                    table.c.source_account_id != account_id
+                ).values(dest_account_id=None, change_seq=seq),
+                execution_options={"synchronize_session": False}
+            )
+        db.commit()
+
+        DeletionService._delete_in_chunks(db, Transaction, or_(
+            Transaction.source_account_id == account_id,
+            Transaction.dest_account_id == account_id
+        ), sync_user_id=user_id)
+        DeletionService._delete_archived(db, lambda table: or_(
+            table.c.source_account_id == account_id,
+            table.c.dest_account_id == account_id
+        ), sync_user_id=user_id)
+        db.execute(delete(CardCycle).where(CardCycle.account_id == account_id), execution_options={"synchronize_session": False})
+        db.execute(delete(Account).where(Account.id == account_id), execution_options={"synchronize_session": False})
+        sync.record_deletes(db, user_id, Account.__tablename__, [account_id])
+        # Its opening balance and transactions leave the whole history
+        NetWorthService.rebuild(db, user_id)
+        db.commit()
+        SuggestionService.invalidate(user_id)
+        ReferenceService.invalidate(user_id)
+
+    @staticmethod
+    def delete_user(user_id: int):
+        """Delete a user and all their data in chunks (run as a background task)"""
+        db = session_for_user(user_id)
+        try:
+            # Children before parents so foreign keys hold at every step
+            DeletionService._delete_in_chunks(db, Transaction, Transaction.user_id == user_id)
+            DeletionService._delete_archived(db, lambda table: table.c.user_id == user_id)
+            DeletionService._delete_in_chunks(db, Budget, Budget.user_id == user_id)
+            DeletionService._delete_in_chunks(db, Category, Category.user_id == user_id)
+            DeletionService._delete_in_chunks(db, CardCycle, CardCycle.user_id == user_id)
+            db.execute(delete(NetWorthSnapshot).where(NetWorthSnapshot.user_id == user_id), execution_options={"synchronize_session": False})
+            DeletionService._delete_in_chunks(db, Account, Account.user_id == user_id)
+            db.execute(delete(User).where(User.id == user_id), execution_options={"synchronize_session": False})
+            sync.forget_user(db, user_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        release_shard(user_id)
+        SuggestionService.invalidate(user_id)
+        ReferenceService.invalidate(user_id)
@@ -0,0 +1,187 @@
+from datetime import date, timedelta
+import pandas as pd
+from sqlalchemy import func, case, delete, insert, update
+from sqlalchemy.orm import Session, aliased
+from app import archive
+from app.models import Account, AccountType, TransactionType, NetWorthSnapshot
+
+# Most points a series returns when the granularity is picked automatically
+MAX_POINTS = 366
+
+# Granularity -> pandas period code, finest first
+GRANULARITIES = {"day": "D", "week": "W", "month": "M", "year": "Y"}
+
+_CASH_LIKE = (AccountType.BANK, AccountType.CASH)
+
+
+class NetWorthService:
+    """Daily net-worth history, kept as per-user snapshots updated by every write"""
+
+    @staticmethod
+    def _live(db: Session, user_id: int) -> float:
+        """Net worth from the accounts as they stand in the session's transaction"""
+        value = case(
+            (Account.type.in_(_CASH_LIKE), func.coalesce(Account.current_balance, 0.0)),
+            (Account.type == AccountType.CREDIT_CARD, -func.coalesce(Account.used_amount, 0.0)),
+            else_=0.0
+        )
+        return db.query(func.coalesce(func.sum(value), 0.0)).filter(Account.user_id == user_id).scalar()
+
+    @staticmethod
+    def _daily_deltas(db: Session, user_id: int) -> list:
+        """(day, net-worth change) for every day with transactions.
+
+        Mirrors TransactionService: income into a bank/cash account adds, an
+        expense from any account subtracts, and each side of a transfer moves
+        net worth only when it leaves a bank/cash account or lands anywhere.
+        """
+        txn = archive.transaction_source(db)
+        source = aliased(Account)
+        dest = aliased(Account)
+        delta = case(
+            (txn.type == TransactionType.INCOME,
+             case((dest.type.in_(_CASH_LIKE), txn.amount), else_=0.0)),
+            (txn.type == TransactionType.EXPENSE,
+             case((source.id.isnot(None), -txn.amount), else_=0.0)),
+            else_=case((source.type.in_(_CASH_LIKE), -txn.amount), else_=0.0)
+            + case((dest.id.isnot(None), txn.amount), else_=0.0)
+        )
+        return db.query(txn.date, func.sum(delta)).outerjoin(
+            source, source.id == txn.source_account_id
+        ).outerjoin(
+            dest, dest.id == txn.dest_account_id
+        ).filter(txn.user_id == user_id).group_by(txn.date).all()
+
+    @staticmethod
+    def _build(db: Session, user_id: int, today: date) -> pd.Series:
+        """Net worth at the end of every day from the first transaction through
+        today (or the latest dated one), computed from history.
+
+        Worked backwards from the accounts' live net worth, so the last day
+        always matches it; replaying transactions alone can't see what
+        apply_transaction clamps away (a card's used amount never goes below 0).
+        """
+        deltas = pd.Series(dict(NetWorthService._daily_deltas(db, user_id)), dtype="float64")
+        first = min(deltas.index.min(), today) if len(deltas) else today
+        last = max(deltas.index.max(), today) if len(deltas) else today
+        days = pd.date_range(first, last, freq="D").date
+        totals = deltas.reindex(days, fill_value=0.0).cumsum()
+        return totals + (NetWorthService._live(db, user_id) - totals.iloc[-1])
+
+    @staticmethod
+    def rebuild(db: Session, user_id: int, today: date = None):
+        """Replace the user's snapshots with ones computed from history, in the caller's transaction"""
+        series = NetWorthService._build(db, user_id, today or date.today())
+        db.execute(delete(NetWorthSnapshot).where(NetWorthSnapshot.user_id == user_id))
+        db.execute(insert(NetWorthSnapshot), [
+            {"user_id": user_id, "day": day, "net_worth": float(value)}
+            for day, value in series.items()
+        ])
+
+    @staticmethod
+    def record(db: Session, user_id: int, day: date, delta: float,
+               build_missing: bool = True, today: date = None):
+        """Add `delta` to the user's net worth from `day` on (every day when None),
+        in the caller's transaction.
+
+        Flushing first takes the user's sync cursor lock (app/sync.py), so one
+        user's writes update their snapshots one at a time. A user without
+        snapshots gets them built from history when `build_missing`, as does a
+        change dated before the first snapshot; the flushed change is then
+        already part of it.
+        """
+        today = today or date.today()
+        db.flush()
+        first, last = db.query(
+            func.min(NetWorthSnapshot.day), func.max(NetWorthSnapshot.day)
+        ).filter(NetWorthSnapshot.user_id == user_id).one()
+        if last is None:
+            if build_missing:
+                NetWorthService.rebuild(db, user_id, today)
+            return
+        if day and day < first:
+            NetWorthService.rebuild(db, user_id, today)
+            return
+
+        # Quiet days since the last write carry its value forward
+        through = max(today, day or today)
+        if last < through:
+            value = db.query(NetWorthSnapshot.net_worth).filter(
+                NetWorthSnapshot.user_id == user_id, NetWorthSnapshot.day == last
+            ).scalar()
+            db.execute(insert(NetWorthSnapshot), [
+                {"user_id": user_id, "day": last + timedelta(days=offset), "net_worth": value}
+                for offset in range(1, (through - last).days + 1)
+            ])
+
+        if delta:
+            changed = update(NetWorthSnapshot).where(NetWorthSnapshot.user_id == user_id)
+            if day:
+                changed = changed.where(NetWorthSnapshot.day >= day)
+            db.execute(
+                changed.values(net_worth=NetWorthSnapshot.net_worth + delta),
+                execution_options={"synchronize_session": False}
+            )
+
+    @staticmethod
+    def _stored(db: Session, user_id: int, start: date, end: date, today: date) -> pd.Series:
+        """Snapshots in [start, end], extended through today with the last value"""
+        last = db.query(func.max(NetWorthSnapshot.day)).filter(NetWorthSnapshot.user_id == user_id).scalar()
+        if last is None:
+            return None
+        query = db.query(NetWorthSnapshot.day, NetWorthSnapshot.net_worth).filter(
+            NetWorthSnapshot.user_id == user_id
+        )
+        if start:
+            query = query.filter(NetWorthSnapshot.day >= start)
+        if end:
+            query = query.filter(NetWorthSnapshot.day <= end)
+        series = pd.Series(dict(query.order_by(NetWorthSnapshot.day).all()), dtype="float64")
+
+        if last < today:
+            value = db.query(NetWorthSnapshot.net_worth).filter(
+                NetWorthSnapshot.user_id == user_id, NetWorthSnapshot.day == last
+            ).scalar()
+            quiet = pd.date_range(last + timedelta(days=1), today, freq="D").date
+            series = pd.concat([series, pd.Series(value, index=quiet, dtype="float64")])
+        return series
+
+    @staticmethod
+    def get_series(db: Session, user_id: int, start: date = None, end: date = None,
+                   granularity: str = "auto", max_points: int = MAX_POINTS, today: date = None) -> dict:
+        """Net worth at the end of each day, week, month or year in [start, end].
+
+        Read-only: stored snapshots, or for a user who has none yet, a series
+        computed from history (their next write stores it). "auto" picks the
+        finest granularity that fits in `max_points`. Each point is the closing
+        value of its period; labels are the period's first day ("2025-03" for
+        months, "2025" for years).
+        """
+        today = today or date.today()
+        series = NetWorthService._stored(db, user_id, start, end, today)
+        if series is None:
+            series = NetWorthService._build(db, user_id, today)
+        series = series[[(start is None or day >= start) and (end is None or day <= end) for day in series.index]]
+        if series.empty:
+            return {"granularity": "day" if granularity == "auto" else granularity, "labels": [], "values": []}
+
+        series.index = pd.DatetimeIndex(series.index)
+        if granularity == "auto":
+            span = (series.index[-1] - series.index[0]).days + 1
+            granularity = next(
+                (name for name, days in (("day", 1), ("week", 7), ("month", 31)) if span / days <= max_points),
+                "year"
+            )
+
+        closing = series.groupby(series.index.to_period(GRANULARITIES[granularity])).last()
+        if granularity == "month":
+            labels = [period.strftime("%Y-%m") for period in closing.index]
+        elif granularity == "year":
+            labels = [str(period.year) for period in closing.index]
+        else:
+            labels = [period.start_time.date().isoformat() for period in closing.index]
+        return {
+            "granularity": granularity,
+            "labels": labels,
+            "values": [round(float(value), 2) for value in closing]
+        }
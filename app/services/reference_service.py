@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.models import Account, Category, AccountType, CategoryType
+from app.config import settings
+from app.metrics import observe_cache
+from app import repository
+
+# Users whose reference data is kept per process
+MAX_USERS = 5000
+
+
+class AccountRef(NamedTuple):
+    """Read-only snapshot of an Account, as used by pages and dropdowns"""
+    id: int
+    user_id: int
+    type: AccountType
+    name: str
+    bank_name: Optional[str]
+    account_number: Optional[str]
+    initial_balance: float
+    current_balance: float
+    total_limit: float
+    used_amount: float
+    billing_date: Optional[int]
+    due_date: Optional[int]
+
+
+class CategoryRef(NamedTuple):
+    """Read-only snapshot of a Category"""
+    id: int
+    user_id: int
+    name: str
+    type: CategoryType
+    is_system: bool
+
+
+# user id -> (loaded at, accounts, categories), least recently used first
+_cache = OrderedDict()
+_lock = Lock()
+# Bumped on every invalidation, so a load that raced with a write isn't cached
+_generation = 0
+
+
+class ReferenceService:
+    """Per-user cache of accounts and categories for page rendering.
+
+    Entries are immutable tuples rather than ORM objects, so they can be shared
+    between requests and cost nothing to hydrate. Writes to accounts and
+    categories (including balance changes) invalidate the user's entry; entries
+    also expire after REFERENCE_CACHE_TTL seconds so changes made by other
+    workers show up.
+    """
+
+    @staticmethod
+    def _load(db: Session, user_id: int) -> tuple:
+        accounts = tuple(map(AccountRef._make, repository.owned_rows(db, Account, AccountRef._fields, user_id)))
+        categories = tuple(map(CategoryRef._make, repository.owned_rows(db, Category, CategoryRef._fields, user_id)))
+        return accounts, categories
+
+    @staticmethod
+    def _get(db: Session, user_id: int) -> tuple:
+        now = time.monotonic()
+        with _lock:
+            entry = _cache.get(user_id)
+            if entry and now - entry[0] < settings.REFERENCE_CACHE_TTL:
+                _cache.move_to_end(user_id)
+                observe_cache("reference_data", True)
+                return entry[1:]
+            generation = _generation
+        observe_cache("reference_data", False)
+
+        accounts, categories = ReferenceService._load(db, user_id)
+        with _lock:
+            if generation == _generation:
+                _cache[user_id] = (now, accounts, categories)
+                _cache.move_to_end(user_id)
+                while len(_cache) > MAX_USERS:
+                    _cache.popitem(last=False)
+        return accounts, categories
+
+    @staticmethod
+    def accounts(db: Session, user_id: int, account_type: AccountType = None) -> tuple:
+        """The user's accounts, optionally only those of one type"""
+        accounts = ReferenceService._get(db, user_id)[0]
+        if account_type is None:
+            return accounts
+        return tuple(a for a in accounts if a.type == account_type)
+
+    @staticmethod
+    def categories(db: Session, user_id: int, category_type: CategoryType = None) -> tuple:
+        """The user's categories, optionally only those of one type"""
+        categories = ReferenceService._get(db, user_id)[1]
+        if category_type is None:
+            return categories
+        return tuple(c for c in categories if c.type == category_type)
+
+    @staticmethod
+    def names(refs: tuple) -> dict:
+        """id -> name, for showing a transaction's account or category without loading it"""
+        return {ref.id: ref.name for ref in refs}
+
+    @staticmethod
+    def invalidate(user_id: int):
+        """Forget a user's accounts and categories after they change"""
+        global _generation
+        with _lock:
+            _generation += 1
+            _cache.pop(user_id, None)
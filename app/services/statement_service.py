@@ -0,0 +1,91 @@
+from sqlalchemy import func, case, and_, or_, literal
+from sqlalchemy.orm import Session
+from app import archive
+from app.models import Transaction, Account, Category, AccountType, TransactionType
+from datetime import date
+
+
+class StatementService:
+    """Per-account statements with running balances computed in SQL"""
+
+    @staticmethod
+    def balance_delta(account: Account, txn=Transaction):
+        """SQL expression for how each transaction moved this account's balance.
+
+        Mirrors TransactionService: bank/cash balances go up on income and
+        incoming transfers; a card's outstanding amount goes up on expenses and
+        down on payments (transfers into it). `txn` is the transaction source
+        to read (see app/archive.py).
+        """
+        if account.type == AccountType.CREDIT_CARD:
+            return case(
+                (and_(txn.source_account_id == account.id, txn.type == TransactionType.EXPENSE), txn.amount),
+                (and_(txn.dest_account_id == account.id, txn.type == TransactionType.TRANSFER), -txn.amount),
+                else_=0.0
+            )
+        return case(
+            (and_(
+                txn.dest_account_id == account.id,
+                txn.type.in_([TransactionType.INCOME, TransactionType.TRANSFER])
+            ), txn.amount),
+            (and_(
+                txn.source_account_id == account.id,
+                txn.type.in_([TransactionType.EXPENSE, TransactionType.TRANSFER])
+            ), -txn.amount),
+            else_=0.0
+        )
+
+    @staticmethod
+    def get_statement(db: Session, account: Account, date_from: date, date_to: date,
+                      page: int = 1, per_page: int = 50) -> dict:
+        """Opening/closing balance, totals and one page of entries with running balance"""
+        # Everything up to the end of the range: archived years count towards the opening balance
+        txn = archive.transaction_source(db, None, date_to)
+        delta = StatementService.balance_delta(account, txn)
+        touches_account = and_(
+            txn.user_id == account.user_id,
+            or_(txn.source_account_id == account.id, txn.dest_account_id == account.id)
+        )
+        in_range = and_(touches_account, txn.date >= date_from, txn.date <= date_to)
+
+        # Opening balance: starting balance plus everything before the range, in one aggregate
+        starting = 0.0 if account.type == AccountType.CREDIT_CARD else (account.initial_balance or 0.0)
+        before = db.query(func.coalesce(func.sum(delta), 0.0)).filter(
+            touches_account, txn.date < date_from
+        ).scalar()
+        opening_balance = starting + before
+
+        entry_count, money_in, money_out = db.query(
+            func.count(txn.id),
+            func.coalesce(func.sum(case((delta > 0, delta), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((delta < 0, -delta), else_=0.0)), 0.0)
+        ).filter(in_range).one()
+
+        # Running balance over the whole range, then cut out the requested page
+        entries = db.query(
+            txn.id,
+            txn.date,
+            txn.type,
+            txn.description,
+            Category.name.label("category"),
+            delta.label("amount"),
+            (literal(opening_balance) + func.sum(delta).over(
+                order_by=(txn.date, txn.id),
+                rows=(None, 0)
+            )).label("balance")
+        ).outerjoin(
+            Category, Category.id == txn.category_id
+        ).filter(in_range).subquery()
+
+        rows = db.query(entries).order_by(
+            entries.c.date, entries.c.id
+        ).offset((page - 1) * per_page).limit(per_page).all()
+
+        return {
+            "opening_balance": opening_balance,
+            "closing_balance": opening_balance + money_in - money_out,
+            "money_in": money_in,
+            "money_out": money_out,
+            "entry_count": entry_count,
+            "entries": rows
+        }
@@ -0,0 +1,146 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from sqlalchemy import func
+from app.models import Transaction
+from app.database import session_for_user
+from app.metrics import observe_cache
+
+# Bounds on the in-memory index: descriptions kept per user, users kept per process
+MAX_DESCRIPTIONS_PER_USER = 2000
+MAX_USERS = 1000
+# A description's weight halves for every this many days since it was last used
+RECENCY_HALF_LIFE_DAYS = 90
+
+
+class _UserIndex:
+    """One user's past descriptions: sorted lowercase keys for prefix lookup,
+    plus (display text, use count, last used date) per key"""
+
+    __slots__ = ("keys", "entries")
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+
+    def add(self, description: str, count: int, last_used: date):
+        key = description.lower()
+        entry = self.entries.get(key)
+        if entry:
+            entry[1] += count
+            if last_used and (entry[2] is None or last_used > entry[2]):
+                entry[0], entry[2] = description, last_used
+            return
+        if len(self.entries) >= MAX_DESCRIPTIONS_PER_USER:
+            # Make room by dropping the least recently used description
+            self.discard(min(self.entries, key=lambda k: (self.entries[k][2] or date.min, self.entries[k][1])))
+        self.entries[key] = [description, count, last_used]
+        insort(self.keys, key)
+
+    def remove(self, description: str):
+        key = description.lower()
+        entry = self.entries.get(key)
+        if entry:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                self.discard(key)
+
+    def discard(self, key: str):
+        del self.entries[key]
+        self.keys.pop(bisect_left(self.keys, key))
+
+    def search(self, prefix: str, today: date, limit: int) -> list:
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            description, count, last_used = self.entries[self.keys[i]]
+            age = (today - last_used).days if last_used else 365
+            matches.append((count * 0.5 ** (max(age, 0) / RECENCY_HALF_LIFE_DAYS), description))
+            i += 1
+        matches.sort(key=lambda match: -match[0])
+        return [description for _, description in matches[:limit]]
+
+
+# user id -> _UserIndex, least recently used first
+_indexes = OrderedDict()
+_lock = Lock()
+
+
+class SuggestionService:
+    """Description autocomplete from an in-memory, per-user prefix index.
+
+    Each user's index is built from their transactions on first use and then
+    kept current by TransactionService, so lookups never touch the database.
+    The index is per process; other workers pick up changes when they rebuild.
+    """
+
+    @staticmethod
+    def _load(user_id: int) -> _UserIndex:
+        index = _UserIndex()
+        db = session_for_user(user_id)
+        try:
+            rows = db.query(
+                Transaction.description,
+                func.count(Transaction.id),
+                func.max(Transaction.date)
+            ).filter(
+                Transaction.user_id == user_id,
+                Transaction.description != None,
+                Transaction.description != ""
+            ).group_by(Transaction.description).order_by(
+                func.max(Transaction.date).desc()
+            ).limit(MAX_DESCRIPTIONS_PER_USER).all()
+        finally:
+            db.close()
+        for description, count, last_used in rows:
+            if description.strip():
+                index.add(description.strip(), count, last_used)
+        return index
+
+    @staticmethod
+    def suggest(user_id: int, prefix: str, limit: int = 8, today: date = None) -> list:
+        """Past descriptions starting with `prefix`, most used and most recent first"""
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        with _lock:
+            index = _indexes.get(user_id)
+            if index:
+                _indexes.move_to_end(user_id)
+        observe_cache("description_suggestions", index is not None)
+        if index is None:
+            index = SuggestionService._load(user_id)
+            with _lock:
+                index = _indexes.setdefault(user_id, index)
+                while len(_indexes) > MAX_USERS:
+                    _indexes.popitem(last=False)
+        with _lock:
+            return index.search(prefix, today or date.today(), limit)
+
+    @staticmethod
+    def record(user_id: int, description: str, used_on: date):
+        """Count a new use of `description` (no-op until the user's index is built)"""
+        if not description or not description.strip():
+            return
+        with _lock:
+            index = _indexes.get(user_id)
+            if index:
+                index.add(description.strip(), 1, used_on)
+
+    @staticmethod
+    def forget(user_id: int, description: str):
+        """Undo one use of `description` (transaction deleted or edited)"""
+        if not description or not description.strip():
+            return
+        with _lock:
+            index = _indexes.get(user_id)
+            if index:
+                index.remove(description.strip())
+
+    @staticmethod
+    def invalidate(user_id: int):
+        """Drop a user's index after bulk changes; it is rebuilt on next use"""
+        with _lock:
+            _indexes.pop(user_id, None)
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import archive, sync
+from app.models import Account, Category, Budget, Transaction
+
+# Synced models in the order clients should apply them (parents first)
+SYNCED_MODELS = (Account, Category, Budget, Transaction)
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class SyncService:
+    """Delta sync for offline clients, keyed by the user's change sequence (see app/sync.py)"""
+
+    @staticmethod
+    def _rows(db: Session, model, user_id: int, since: int, cursor: int) -> list:
+        # Archived transactions are still the client's rows
+        tables = [model.__table__] + (archive.year_tables(db) if model is Transaction else [])
+        rows = []
+        for table in tables:
+            query = select(table).where(table.c.user_id == user_id)
+            if since:
+                query = query.where(table.c.change_seq > since, table.c.change_seq <= cursor)
+            rows.extend(
+                {key: _json_value(value) for key, value in row.items()}
+                for row in db.execute(query.order_by(table.c.id)).mappings()
+            )
+        if len(tables) > 1:
+            rows.sort(key=lambda row: row["id"])
+        return rows
+
+    @staticmethod
+    def changes(db: Session, user_id: int, since: int = 0) -> dict:
+        """Rows changed and deleted after cursor `since`, plus the cursor to send next time.
+
+        `since` 0 (or a cursor this server never issued) returns every row as a
+        full sync; clients then replace their copy instead of merging.
+        """
+        cursor = sync.current_seq(db, user_id)
+        full = not since or since > cursor
+        result = {"cursor": cursor, "full": full, "changes": {}, "deleted": {}}
+        if not full and since == cursor:
+            return result
+
+        for model in SYNCED_MODELS:
+            result["changes"][model.__tablename__] = SyncService._rows(
+                db, model, user_id, 0 if full else since, cursor
+            )
+        if not full:
+            tombstones = sync.sync_tombstones
+            for entity, entity_id in db.execute(
+                select(tombstones.c.entity, tombstones.c.entity_id).where(
+                    tombstones.c.user_id == user_id,
+                    tombstones.c.change_seq > since,
+                    tombstones.c.change_seq <= cursor
+                ).order_by(tombstones.c.change_seq)
+            ):
+                result["deleted"].setdefault(entity, []).append(entity_id)
+        return result
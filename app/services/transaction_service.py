@@ -1,5 +1,10 @@
 from sqlalchemy.orm import Session
 from app.models import Transaction, Account, AccountType, TransactionType
+from app.services.card_cycle_service import CardCycleService
+from app.services.net_worth_service import NetWorthService
+from app.services.suggestion_service import SuggestionService
+from app.services.reference_service import ReferenceService
+from app import events, group_commit
 from datetime import datetime
 
 
@@ -7,12 +12,59 @@ class TransactionService:
     """Business logic for transaction operations"""
     
     @staticmethod
-    def apply_transaction(db: Session, transaction: Transaction):
-        """Apply transaction effects to account balances"""
+    def _accounts(db: Session, transaction: Transaction) -> list:
+        ids = {transaction.source_account_id, transaction.dest_account_id} - {None}
+        return [account for account in (db.get(Account, account_id) for account_id in ids) if account]
+    
+    @staticmethod
+    def _change_event(transaction: Transaction, accounts: list, before: dict, sign: int) -> dict:
+        """Live-update event: new account balances plus net worth, monthly and budget deltas"""
+        event = {"type": "transaction", "accounts": {}, "net_worth": 0.0,
+                 "monthly_income": 0.0, "monthly_expense": 0.0, "budgets": {}}
+        for account in accounts:
+            balance, used = before[account.id]
+            if account.type == AccountType.CREDIT_CARD:
+                event["net_worth"] -= (account.used_amount or 0.0) - used
+            else:
+                event["net_worth"] += (account.current_balance or 0.0) - balance
+            event["accounts"][account.id] = {
+                "current_balance": account.current_balance,
+                "used_amount": account.used_amount
+            }
+        
+        # Monthly cards and budgets only cover the current month
+        today = datetime.now().date()
+        if (transaction.date.year, transaction.date.month) == (today.year, today.month):
+            if transaction.type == TransactionType.INCOME:
+                event["monthly_income"] = sign * transaction.amount
+            elif transaction.type == TransactionType.EXPENSE:
+                event["monthly_expense"] = sign * transaction.amount
+                if transaction.category_id:
+                    event["budgets"][transaction.category_id] = sign * transaction.amount
+        return event
+    
+    @staticmethod
+    def _commit(db: Session, user_id: int, changes: list, then=None):
+        """Commit once, then refresh the user's caches, notify open pages and run `then`"""
+        def after():
+            ReferenceService.invalidate(user_id)
+            for event in changes:
+                events.publish(user_id, event)
+            if then:
+                then()
+        group_commit.commit(db, after)
+    
+    @staticmethod
+    def apply_transaction(db: Session, transaction: Transaction) -> dict:
+        """Apply transaction effects to account balances; returns the live-update
+        event for the caller to publish once it commits"""
+        accounts = TransactionService._accounts(db, transaction)
+        before = {a.id: (a.current_balance or 0.0, a.used_amount or 0.0) for a in accounts}
+        
         if transaction.type == TransactionType.INCOME:
             # Income: Increase bank account balance
             if transaction.dest_account_id:
-                account = db.query(Account).filter(Account.id == transaction.dest_account_id).first()
+                account = db.get(Account, transaction.dest_account_id)
                 if account and account.type == AccountType.BANK:
                     account.current_balance += transaction.amount
                 elif account and account.type == AccountType.CASH:
@@ -21,48 +73,56 @@ class TransactionService:
         elif transaction.type == TransactionType.EXPENSE:
             # Expense: Decrease bank balance OR increase CC usage
             if transaction.source_account_id:
-                account = db.query(Account).filter(Account.id == transaction.source_account_id).first()
+                account = db.get(Account, transaction.source_account_id)
                 if account:
                     if account.type == AccountType.BANK or account.type == AccountType.CASH:
                         account.current_balance -= transaction.amount
                     elif account.type == AccountType.CREDIT_CARD:
                         account.used_amount += transaction.amount
+                        CardCycleService.record(db, account, transaction.date, spend=transaction.amount)
         
         elif transaction.type == TransactionType.TRANSFER:
-            # Transfer: Decrease source, adjust destination
-            if transaction.source_account_id and transaction.dest_account_id:
-                source = db.query(Account).filter(Account.id == transaction.source_account_id).first()
-                dest = db.query(Account).filter(Account.id == transaction.dest_account_id).first()
-                
-                if source and dest:
-                    # Decrease source (usually a bank account)
-                    if source.type == AccountType.BANK or source.type == AccountType.CASH:
-                        source.current_balance -= transaction.amount
-                    
-                    # Adjust destination
-                    if dest.type == AccountType.CREDIT_CARD:
-                        # Paying off credit card
-                        dest.used_amount -= transaction.amount
-                        if dest.used_amount < 0:
-                            dest.used_amount = 0
-                    elif dest.type == AccountType.BANK or dest.type == AccountType.CASH:
-                        # Transfer to another bank/cash
-                        dest.current_balance += transaction.amount
+            # Transfer: Decrease source, adjust destination. Transfers are created
+            # with both sides; each is applied on its own because deleting an
+            # account clears its side (DeletionService.delete_account).
+            source = db.get(Account, transaction.source_account_id) if transaction.source_account_id else None
+            dest = db.get(Account, transaction.dest_account_id) if transaction.dest_account_id else None
+            
+            # Decrease source (usually a bank account)
+            if source and (source.type == AccountType.BANK or source.type == AccountType.CASH):
+                source.current_balance -= transaction.amount
+            
+            # Adjust destination
+            if dest and dest.type == AccountType.CREDIT_CARD:
+                # Paying off credit card
+                dest.used_amount -= transaction.amount
+                if dest.used_amount < 0:
+                    dest.used_amount = 0
+                CardCycleService.record(db, dest, transaction.date, payments=transaction.amount)
+            elif dest and (dest.type == AccountType.BANK or dest.type == AccountType.CASH):
+                # Transfer to another bank/cash
+                dest.current_balance += transaction.amount
         
-        db.commit()
+        event = TransactionService._change_event(transaction, accounts, before, sign=1)
+        NetWorthService.record(db, transaction.user_id, transaction.date, event["net_worth"])
+        return event
     
     @staticmethod
-    def revert_transaction(db: Session, transaction: Transaction):
-        """Revert transaction effects from account balances"""
+    def revert_transaction(db: Session, transaction: Transaction) -> dict:
+        """Revert transaction effects from account balances; returns the live-update
+        event for the caller to publish once it commits"""
+        accounts = TransactionService._accounts(db, transaction)
+        before = {a.id: (a.current_balance or 0.0, a.used_amount or 0.0) for a in accounts}
+        
         if transaction.type == TransactionType.INCOME:
             if transaction.dest_account_id:
-                account = db.query(Account).filter(Account.id == transaction.dest_account_id).first()
+                account = db.get(Account, transaction.dest_account_id)
                 if account and (account.type == AccountType.BANK or account.type == AccountType.CASH):
                     account.current_balance -= transaction.amount
         
         elif transaction.type == TransactionType.EXPENSE:
             if transaction.source_account_id:
-                account = db.query(Account).filter(Account.id == transaction.source_account_id).first()
+                account = db.get(Account, transaction.source_account_id)
                 if account:
                     if account.type == AccountType.BANK or account.type == AccountType.CASH:
                         account.current_balance += transaction.amount
@@ -70,52 +130,73 @@ class TransactionService:
                         account.used_amount -= transaction.amount
                         if account.used_amount < 0:
                             account.used_amount = 0
+                        CardCycleService.record(db, account, transaction.date, spend=-transaction.amount)
         
         elif transaction.type == TransactionType.TRANSFER:
-            if transaction.source_account_id and transaction.dest_account_id:
-                source = db.query(Account).filter(Account.id == transaction.source_account_id).first()
-                dest = db.query(Account).filter(Account.id == transaction.dest_account_id).first()
-                
-                if source and dest:
-                    # Revert source
-                    if source.type == AccountType.BANK or source.type == AccountType.CASH:
-                        source.current_balance += transaction.amount
-                    
-                    # Revert destination
-                    if dest.type == AccountType.CREDIT_CARD:
-                        dest.used_amount += transaction.amount
-                    elif dest.type == AccountType.BANK or dest.type == AccountType.CASH:
-                        dest.current_balance -= transaction.amount
+            source = db.get(Account, transaction.source_account_id) if transaction.source_account_id else None
+            dest = db.get(Account, transaction.dest_account_id) if transaction.dest_account_id else None
+            
+            # Revert source
+            if source and (source.type == AccountType.BANK or source.type == AccountType.CASH):
+                source.current_balance += transaction.amount
+            
+            # Revert destination
+            if dest and dest.type == AccountType.CREDIT_CARD:
+                dest.used_amount += transaction.amount
+                CardCycleService.record(db, dest, transaction.date, payments=-transaction.amount)
+            elif dest and (dest.type == AccountType.BANK or dest.type == AccountType.CASH):
+                dest.current_balance -= transaction.amount
         
-        db.commit()
+        event = TransactionService._change_event(transaction, accounts, before, sign=-1)
+        # Users without snapshots get them on the apply that follows (or their next write)
+        NetWorthService.record(db, transaction.user_id, transaction.date, event["net_worth"], build_missing=False)
+        return event
     
     @staticmethod
     def create_transaction(db: Session, transaction_data: dict, user_id: int) -> Transaction:
         """Create a new transaction and update balances"""
+        # Only deleting an account leaves a transfer with one side (see apply_transaction)
+        if transaction_data["type"] == TransactionType.TRANSFER and not (
+            transaction_data.get("source_account_id") and transaction_data.get("dest_account_id")
+        ):
+            raise ValueError("A transfer needs both a source and a destination account")
+        
         transaction = Transaction(**transaction_data, user_id=user_id)
         db.add(transaction)
         db.flush()  # Get the ID
         
-        TransactionService.apply_transaction(db, transaction)
+        event = TransactionService.apply_transaction(db, transaction)
+        description, used_on = transaction.description, transaction.date
+        TransactionService._commit(
+            db, user_id, [event], lambda: SuggestionService.record(user_id, description, used_on)
+        )
         return transaction
     
     @staticmethod
     def update_transaction(db: Session, transaction: Transaction, update_data: dict):
         """Update transaction and recalculate balances"""
         # First revert the old transaction
-        TransactionService.revert_transaction(db, transaction)
+        reverted = TransactionService.revert_transaction(db, transaction)
+        old_description = transaction.description
         
         # Update transaction fields
         for key, value in update_data.items():
             if hasattr(transaction, key):
                 setattr(transaction, key, value)
         
-        # Apply the new transaction
-        TransactionService.apply_transaction(db, transaction)
+        # Apply the new transaction, then commit both halves together
+        applied = TransactionService.apply_transaction(db, transaction)
+        user_id, description, used_on = transaction.user_id, transaction.description, transaction.date
+        
+        def suggestions():
+            SuggestionService.forget(user_id, old_description)
+            SuggestionService.record(user_id, description, used_on)
+        TransactionService._commit(db, user_id, [reverted, applied], suggestions)
     
     @staticmethod
     def delete_transaction(db: Session, transaction: Transaction):
         """Delete transaction and revert balances"""
-        TransactionService.revert_transaction(db, transaction)
+        event = TransactionService.revert_transaction(db, transaction)
+        user_id, description = transaction.user_id, transaction.description
         db.delete(transaction)
-        db.commit()
+        TransactionService._commit(db, user_id, [event], lambda: SuggestionService.forget(user_id, description))
@@ -0,0 +1,153 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app import sync
+from app.models import User, Category, UserRole, CategoryType
+from app.auth import hash_passwords
+from app.database import SessionLocal, assign_shards, release_shard, session_for_user, shard_engines
+from app.metrics import observe_cache
+
+ADMIN_USER_ID = "adminExpense"
+PROVISION_BATCH_SIZE = 500
+
+# Used when the admin has no system categories to copy from
+FALLBACK_CATEGORIES = [
+    ("Salary", CategoryType.INCOME),
+    ("Other Income", CategoryType.INCOME),
+    ("Food & Dining", CategoryType.EXPENSE),
+    ("Other Expense", CategoryType.EXPENSE)
+]
+
+# (name, type) pairs copied into every new user's categories
+_category_template = None
+
+
+class UserService:
+    """User provisioning"""
+
+    @staticmethod
+    def default_category_template() -> list:
+        """The admin's system categories as (name, type) pairs, cached per process"""
+        global _category_template
+        observe_cache("category_template", _category_template is not None)
+        if _category_template is None:
+            db = SessionLocal()
+            try:
+                admin = db.query(User).filter(User.user_id == ADMIN_USER_ID).first()
+                template = []
+                if admin:
+                    admin_db = session_for_user(admin.id)
+                    try:
+                        template = admin_db.query(Category.name, Category.type).filter(
+                            Category.user_id == admin.id,
+                            Category.is_system == True
+                        ).order_by(Category.id).all()
+                    finally:
+                        admin_db.close()
+                _category_template = [tuple(row) for row in template] or FALLBACK_CATEGORIES
+            finally:
+                db.close()
+        return _category_template
+
+    @staticmethod
+    def invalidate_category_template():
+        """Forget the cached template (after the admin edits a system category)"""
+        global _category_template
+        _category_template = None
+
+    @staticmethod
+    def _add_categories(db: Session, user_ids: list, template: list):
+        """Insert the template categories for new users, stamped with a change
+        sequence so delta syncs pick them up"""
+        seqs = {user_id: sync.next_seq(db, user_id) for user_id in user_ids}
+        db.execute(insert(Category), [{
+            "user_id": user_id,
+            "name": name,
+            "type": category_type,
+            "is_system": True,
+            "change_seq": seqs[user_id]
+        } for user_id in user_ids for name, category_type in template])
+
+    @staticmethod
+    def provision_users(db: Session, users: list, must_change_password: bool = True) -> tuple:
+        """Create users with their default categories in set-based batches.
+
+        `users` is a list of dicts with user_id, password, name and optionally
+        email and role. Usernames that already exist are skipped. Returns
+        (created, skipped) usernames.
+
+        With one database a batch's users and categories commit together. With
+        shards the users commit on the primary first (they are copied to their
+        home shards), then each shard's categories in one transaction; if one
+        fails, the batch's users still without categories are deleted again
+        and the error is raised. Earlier batches stay created.
+        """
+        template = UserService.default_category_template()
+        created, skipped = [], []
+
+        for start in range(0, len(users), PROVISION_BATCH_SIZE):
+            batch = users[start:start + PROVISION_BATCH_SIZE]
+
+            usernames = [u["user_id"] for u in batch]
+            existing = set(db.scalars(select(User.user_id).where(User.user_id.in_(usernames))))
+            new_users, seen = [], set(existing)
+            for u in batch:
+                if u["user_id"] in seen:
+                    skipped.append(u["user_id"])
+                else:
+                    seen.add(u["user_id"])
+                    new_users.append(u)
+            if not new_users:
+                continue
+
+            # bcrypt dominates provisioning time: hash the batch in parallel
+            hashes = hash_passwords([u["password"] for u in new_users])
+            db.execute(insert(User), [{
+                "user_id": u["user_id"],
+                "password_hash": password_hash,
+                "role": UserRole.ADMIN if u.get("role") == "admin" else UserRole.USER,
+                "name": u["name"],
+                "email": u.get("email") or None,
+                "is_active": True,
+                "must_change_password": must_change_password
+            } for u, password_hash in zip(new_users, hashes)])
+
+            ids = list(db.scalars(
+                select(User.id).where(User.user_id.in_([u["user_id"] for u in new_users]))
+            ))
+
+            if len(shard_engines) == 1:
+                UserService._add_categories(db, ids, template)
+                db.commit()
+            else:
+                UserService._provision_shards(db, ids, template)
+
+            created += [u["user_id"] for u in new_users]
+
+        return created, skipped
+
+    @staticmethod
+    def _provision_shards(db: Session, ids: list, template: list):
+        """Commit new users, then their categories with one transaction per home shard"""
+        db.commit()  # assign_shards reads the users on its own connection
+        by_shard = {}
+        for user_id, shard in assign_shards(ids).items():
+            by_shard.setdefault(shard, []).append(user_id)
+
+        pending = set(ids)
+        try:
+            for shard, user_ids in by_shard.items():
+                shard_db = SessionLocal(info={"shard": shard})
+                try:
+                    UserService._add_categories(shard_db, user_ids, template)
+                    shard_db.commit()
+                finally:
+                    shard_db.close()
+                pending -= set(user_ids)
+        except Exception:
+            # Don't leave users behind without categories
+            db.rollback()
+            for user_id in pending:
+                release_shard(user_id)
+            db.execute(delete(User).where(User.id.in_(pending)))
+            db.commit()
+            raise
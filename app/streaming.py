@@ -0,0 +1,49 @@
+"""
+Streamed HTML rendering for long pages.
+
+``stream_template`` renders a Jinja template with ``generate()`` and sends it
+through a ``StreamingResponse``: the page shell and filters go out while the
+rows are still being read, and the page is never held in memory as a whole.
+Pass long lists as a batched iterator (e.g. ``query.yield_per(...)``) rather
+than a list so rows are fetched as they are rendered.
+
+Jinja yields many tiny fragments, so they are joined into chunks of about
+``STREAM_CHUNK_SIZE`` bytes before being sent. A template can send what it has
+so far with ``{{ stream_flush }}`` (e.g. just before a long loop); it renders
+as an HTML comment. With ``STREAM_HTML_ENABLED`` off the template is rendered
+in one piece, as ``TemplateResponse`` does.
+"""
+from fastapi.responses import StreamingResponse
+from markupsafe import Markup
+
+from app.config import settings
+
+# Registered as the `stream_flush` template global
+STREAM_FLUSH = Markup("<!-- flush -->")
+
+
+def _chunked(fragments, chunk_size: int):
+    buffer = []
+    size = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= chunk_size or fragment == STREAM_FLUSH:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_template(templates, name: str, context: dict, status_code: int = 200):
+    """Render `name` with `context` as a streamed HTML response"""
+    if not settings.STREAM_HTML_ENABLED:
+        return templates.TemplateResponse(name, context, status_code=status_code)
+
+    template = templates.get_template(name)
+    return StreamingResponse(
+        _chunked(template.generate(context), settings.STREAM_CHUNK_SIZE),
+        status_code=status_code,
+        media_type="text/html"
+    )
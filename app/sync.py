@@ -0,0 +1,121 @@
+"""
+Change sequence for the delta sync API (``/api/sync``).
+
+Each user has a counter in ``sync_cursors``. Every flush that inserts,
+updates or deletes their accounts, categories, budgets or transactions
+takes the next value and stamps it on the rows as ``change_seq``; deleted
+rows leave a tombstone in ``sync_tombstones``. Bumping the counter locks
+the user's cursor row until commit, so their writes commit in sequence
+order: a client that has seen sequence N has seen every change up to N.
+
+Set-based writes bypass the flush, so they call ``next_seq`` and
+``record_deletes`` themselves (see DeletionService, UserService). Rows
+bulk-inserted without a sequence (generated data) only appear in full syncs.
+
+The columns, indexes and tables are added on startup if missing.
+"""
+from datetime import datetime
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table, delete, inspect, insert, select, text, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Per-user tables whose rows carry a change_seq
+SYNCED_TABLES = ("accounts", "categories", "budgets", "transactions")
+
+metadata = MetaData()
+
+sync_cursors = Table(
+    "sync_cursors",
+    metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("seq", Integer, nullable=False)
+)
+
+sync_tombstones = Table(
+    "sync_tombstones",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("entity", String(20), nullable=False),  # table name
+    Column("entity_id", Integer, nullable=False),
+    Column("change_seq", Integer, nullable=False),
+    Column("deleted_at", DateTime, default=datetime.utcnow),
+    Index("ix_sync_tombstones_user_change_seq", "user_id", "change_seq")
+)
+
+
+def install(engine):
+    """Create the sync tables, and add change_seq to tables created before it existed"""
+    metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SYNCED_TABLES:
+            if "change_seq" not in {c["name"] for c in inspector.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN change_seq INTEGER"))
+                conn.execute(text(f"CREATE INDEX ix_{table}_user_change_seq ON {table} (user_id, change_seq)"))
+
+
+def current_seq(session, user_id: int) -> int:
+    """Latest change sequence of a user (0 before their first change)"""
+    return session.execute(
+        select(sync_cursors.c.seq).where(sync_cursors.c.user_id == user_id)
+    ).scalar() or 0
+
+
+def next_seq(session, user_id: int) -> int:
+    """Bump and return a user's change sequence, in the session's transaction"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        upsert = (sqlite if dialect == "sqlite" else postgresql).insert(sync_cursors)
+        return session.execute(
+            upsert.values(user_id=user_id, seq=1).on_conflict_do_update(
+                index_elements=["user_id"], set_={"seq": sync_cursors.c.seq + 1}
+            ).returning(sync_cursors.c.seq)
+        ).scalar_one()
+
+    bumped = session.execute(
+        update(sync_cursors).where(sync_cursors.c.user_id == user_id).values(seq=sync_cursors.c.seq + 1)
+    )
+    if not bumped.rowcount:
+        session.execute(insert(sync_cursors).values(user_id=user_id, seq=1))
+    return current_seq(session, user_id)
+
+
+def record_deletes(session, user_id: int, entity: str, ids: list, seq: int = None):
+    """Leave tombstones for deleted rows of `entity` (a table name)"""
+    if not ids:
+        return
+    if seq is None:
+        seq = next_seq(session, user_id)
+    session.execute(insert(sync_tombstones), [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "change_seq": seq}
+        for entity_id in ids
+    ])
+
+
+def forget_user(session, user_id: int):
+    """Drop a deleted user's cursor and tombstones"""
+    session.execute(delete(sync_tombstones).where(sync_tombstones.c.user_id == user_id))
+    session.execute(delete(sync_cursors).where(sync_cursors.c.user_id == user_id))
+
+
+def stamp_changes(session, flush_context, instances):
+    """before_flush hook: stamp changed rows and tombstone deleted ones, per user"""
+    changes = {}  # user id -> ([changed objects], [(table, id) deleted])
+    for obj in session.new | session.dirty:
+        if getattr(obj, "__tablename__", None) in SYNCED_TABLES and (
+            obj in session.new or session.is_modified(obj)
+        ):
+            changes.setdefault(obj.user_id, ([], []))[0].append(obj)
+    for obj in session.deleted:
+        if getattr(obj, "__tablename__", None) in SYNCED_TABLES:
+            changes.setdefault(obj.user_id, ([], []))[1].append((obj.__tablename__, obj.id))
+
+    for user_id, (changed, deleted) in changes.items():
+        seq = next_seq(session, user_id)
+        for obj in changed:
+            obj.change_seq = seq
+        for entity in {entity for entity, _ in deleted}:
+            record_deletes(session, user_id, entity, [i for e, i in deleted if e == entity], seq)
@@ -0,0 +1,196 @@
+"""
+HTTP load-test harness.
+
+Drives the main read paths of a running server with a fixed number of
+concurrent clients, each logged in as a different generated user (see
+``python -m app.generate_data``), and reports latency percentiles and
+throughput per endpoint. Results are saved as JSON tagged with the current
+git commit so runs can be compared across commits.
+
+    uvicorn main:app --workers 4 &
+    python benchmarks/run.py --concurrency 16 --requests 400
+    python benchmarks/run.py --compare benchmarks/results/<older>.json
+
+Only the standard library is used so it runs from any environment.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+DEFAULT_ENDPOINTS = [
+    "/dashboard",
+    "/transactions",
+    "/api/analytics/expense-breakdown",
+    "/api/analytics/trend",
+    "/api/analytics/income-vs-expense",
+    "/api/analytics/payment-mode",
+    "/export/csv",
+    "/export/excel",
+]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class Client:
+    """One logged-in browser session (cookie jar + opener)"""
+
+    def __init__(self, base_url: str, username: str, password: str):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        body = urllib.parse.urlencode({"user_id": username, "password": password}).encode()
+        with self.opener.open(self.base_url + "/login", data=body, timeout=30) as resp:
+            if resp.url.rstrip("/").endswith("/login"):
+                raise RuntimeError(f"Login failed for {username}")
+
+    def get(self, path: str):
+        """Fetch a path, returning (status, seconds, bytes)"""
+        request = urllib.request.Request(self.base_url + path, headers={"Accept-Encoding": "gzip, br"})
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=120) as resp:
+                size = len(resp.read())
+                status = resp.status
+        except urllib.error.HTTPError as exc:
+            size, status = 0, exc.code
+        return status, time.perf_counter() - start, size
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run_endpoint(clients: list, path: str, total_requests: int) -> dict:
+    """Issue `total_requests` GETs for `path` spread over all clients"""
+    latencies, errors, sizes = [], 0, 0
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker(client):
+        nonlocal errors, sizes
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            status, elapsed, size = client.get(path)
+            with lock:
+                latencies.append(elapsed)
+                sizes += size
+                if status >= 400:
+                    errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        list(pool.map(worker, clients))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "avg_bytes": sizes // len(latencies) if latencies else 0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results: dict, baseline: dict = None):
+    header = f"{'endpoint':<36} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>5}"
+    if baseline:
+        header += f" {'Δp95':>8} {'Δrps':>8}"
+    print(header)
+    print("-" * len(header))
+    for path, r in results.items():
+        line = f"{path:<36} {r['throughput_rps']:>9.1f} {r['p50_ms']:>8.1f}ms {r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms {r['errors']:>5}"
+        old = (baseline or {}).get(path)
+        if old:
+            p95 = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            rps = (r["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100 if old["throughput_rps"] else 0.0
+            line += f" {p95:>+7.1f}% {rps:>+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Expense Flow endpoints")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent logged-in clients")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--user-prefix", default="loadtest_", help="prefix used by app.generate_data")
+    parser.add_argument("--password", default="loadtest")
+    parser.add_argument("--users", type=int, default=None, help="distinct users to log in as (default: concurrency)")
+    parser.add_argument("--endpoints", nargs="*", default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests per client and endpoint")
+    parser.add_argument("--label", default=None, help="result label (default: git revision)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    users = args.users or args.concurrency
+    print(f"Logging in {args.concurrency} clients as {users} users...")
+    clients = [
+        Client(args.base_url, f"{args.user_prefix}{i % users:05d}", args.password)
+        for i in range(args.concurrency)
+    ]
+
+    results = {}
+    for path in args.endpoints:
+        for client in clients:
+            for _ in range(args.warmup):
+                client.get(path)
+        results[path] = run_endpoint(clients, path, args.requests)
+        print(f"✓ {path}: p95 {results[path]['p95_ms']}ms, {results[path]['throughput_rps']} req/s")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print()
+    print_table(results, baseline)
+
+    if not args.no_save:
+        label = args.label or git_revision()
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{label}.json")
+        with open(path, "w") as f:
+            json.dump({
+                "label": label,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "base_url": args.base_url,
+                "concurrency": args.concurrency,
+                "requests_per_endpoint": args.requests,
+                "users": users,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
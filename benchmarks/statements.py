@@ -0,0 +1,120 @@
+"""
+Micro-benchmark: per-call overhead of the hot queries.
+
+Compares the ``db.query(...)`` chains the routes used to build on every
+request with the prebuilt statements in ``app/repository.py``, against a
+throwaway SQLite database, and prints microseconds per call. For the user
+and accounts queries the SQL is identical, so the difference is Python-side
+statement construction and cache-key generation; the monthly total also
+swaps ``extract()`` for a date range.
+
+    python benchmarks/statements.py --calls 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A private database, set up before the app reads its settings
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.pop("DATABASE_SHARD_URLS", None)
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ.pop("DATABASE_SHARD_REPLICA_URLS", None)
+
+from sqlalchemy import extract, func, insert  # noqa: E402
+
+from app import repository  # noqa: E402
+from app.database import SessionLocal, create_all_tables  # noqa: E402
+from app.models import Account, AccountType, Transaction, TransactionType, User  # noqa: E402
+from app.services.reference_service import AccountRef  # noqa: E402
+
+
+def setup():
+    create_all_tables()
+    db = SessionLocal()
+    db.execute(insert(User), [{"id": 1, "user_id": "bench", "password_hash": "x"}])
+    db.execute(insert(Account), [
+        {"user_id": 1, "type": AccountType.BANK, "name": f"Account {i}", "current_balance": 100.0}
+        for i in range(5)
+    ])
+    db.execute(insert(Transaction), [
+        {"user_id": 1, "type": TransactionType.EXPENSE, "amount": 10.0,
+         "date": date(2026, 1 + i % 12, 1 + i % 28), "source_account_id": 1}
+        for i in range(500)
+    ])
+    db.commit()
+    db.close()
+
+
+def query_user(db):
+    return db.query(User).filter(User.id == 1).first()
+
+
+def query_accounts(db):
+    return db.query(*(getattr(Account, field) for field in AccountRef._fields)).filter(
+        Account.user_id == 1
+    ).order_by(Account.id).all()
+
+
+def query_monthly_total(db):
+    return db.query(func.sum(Transaction.amount)).filter(
+        Transaction.user_id == 1,
+        Transaction.type == TransactionType.EXPENSE,
+        extract('month', Transaction.date) == 3,
+        extract('year', Transaction.date) == 2026
+    ).scalar()
+
+
+def repo_user(db):
+    return repository.user_by_id(db, 1)
+
+
+def repo_accounts(db):
+    return repository.owned_rows(db, Account, AccountRef._fields, 1)
+
+
+def repo_monthly_total(db):
+    return repository.transaction_total(db, 1, TransactionType.EXPENSE, *repository.month_range(3, 2026))
+
+
+CASES = [
+    ("user by id", query_user, repo_user),
+    ("accounts for user", query_accounts, repo_accounts),
+    ("monthly total", query_monthly_total, repo_monthly_total),
+]
+
+
+def time_per_call(fn, calls: int) -> float:
+    """Microseconds per call, each in its own session like a request"""
+    for _ in range(100):  # warm the compiled-statement cache
+        db = SessionLocal()
+        fn(db)
+        db.close()
+    start = time.perf_counter()
+    for _ in range(calls):
+        db = SessionLocal()
+        fn(db)
+        db.close()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=5000, help="calls per query (default 5000)")
+    args = parser.parse_args()
+
+    setup()
+    print(f"{'query':<20} {'query chain':>12} {'prebuilt':>12} {'speedup':>8}")
+    for name, chain, prebuilt in CASES:
+        before = time_per_call(chain, args.calls)
+        after = time_per_call(prebuilt, args.calls)
+        print(f"{name:<20} {before:>10.1f}µs {after:>10.1f}µs {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
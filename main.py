@@ -1,12 +1,17 @@
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from starlette.middleware.sessions import SessionMiddleware
 from app.config import settings
-from app.database import Base, engine
+from app.database import create_all_tables
+from app.archive import start_mover
 from app.init_db import init_database
+from app.assets import PrecompressedStaticFiles, asset_url
+from app.compression import CompressionMiddleware
+from app.metrics import MetricsMiddleware, render_metrics
+from app.profiler import SQLProfilerMiddleware
 import os
+import secrets
 
 # Import routes
 from app.routes import (
@@ -18,7 +23,9 @@ from app.routes import (
     budget_routes,
     category_routes,
     export_routes,
-    settings_routes
+    settings_routes,
+    sync_routes,
+    api_routes
 )
 
 # Create FastAPI app
@@ -36,9 +43,21 @@ app.add_middleware(
     max_age=settings.SESSION_MAX_AGE
 )
 
-# Mount static files
+# Opt-in SQL profiler: X-SQL-Profile header, slow-query and N+1 log
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Compress HTML/JSON/CSV responses, including streamed exports
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Per-route latency, status and SQL metrics, exposed at /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Mount static files (hashed builds in /static/dist are cached immutably)
 os.makedirs("app/static", exist_ok=True)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory="app/static"), name="static")
 
 # Include routers
 app.include_router(auth_routes.router)
@@ -46,10 +65,13 @@ app.include_router(dashboard_routes.router)
 app.include_router(admin_routes.router)
 app.include_router(account_routes.router)
 app.include_router(transaction_routes.router)
+app.include_router(transaction_routes.api_router)
 app.include_router(budget_routes.router)
 app.include_router(category_routes.router)
 app.include_router(export_routes.router)
 app.include_router(settings_routes.router)
+app.include_router(sync_routes.router)
+app.include_router(api_routes.router)
 
 # Startup event
 @app.on_event("startup")
@@ -59,11 +81,14 @@ async def startup_event():
     
     # Just create tables if they don't exist (won't recreate existing ones)
     try:
-        Base.metadata.create_all(bind=engine)
+        create_all_tables()
         print("✓ Database tables verified/connected")
     except Exception as e:
         print(f"⚠️  Database connection warning: {e}")
     
+    # Move old transactions to (or back from) the yearly archive in the background
+    start_mover()
+    
     print("✅ Expense Flow is ready!")
 
 
@@ -72,12 +97,14 @@ async def startup_event():
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
     templates = Jinja2Templates(directory="app/templates")
+    templates.env.globals.update(asset_url=asset_url)
     return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
 
 
 @app.exception_handler(500)
 async def server_error_handler(request: Request, exc):
     templates = Jinja2Templates(directory="app/templates")
+    templates.env.globals.update(asset_url=asset_url)
     return templates.TemplateResponse("500.html", {"request": request}, status_code=500)
 
 @app.get("/health-check")
@@ -85,6 +112,17 @@ def read_root():
     return JSONResponse(content="ok")
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(request: Request):
+        if settings.METRICS_TOKEN and not secrets.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+        ):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     # This block is typically used for development with `python main.py`
     # For production, uvicorn is used: `uvicorn main:app --reload`
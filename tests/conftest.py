@@ -0,0 +1,56 @@
+"""
+Shared fixtures. The tests run against a throwaway SQLite database with
+sharding, replicas, Redis and write batching off.
+
+    python -m pytest -q
+"""
+import os
+import tempfile
+import uuid
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+for name in ("DATABASE_SHARD_URLS", "DATABASE_REPLICA_URLS", "DATABASE_SHARD_REPLICA_URLS", "EVENTS_REDIS_URL"):
+    os.environ[name] = ""
+os.environ["WRITE_BATCHING_ENABLED"] = "false"
+os.environ["ARCHIVE_HOT_YEARS"] = "0"
+
+import pytest
+
+from app.database import SessionLocal, create_all_tables
+from app.models import Account, AccountType, User, UserRole
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    create_all_tables()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(user_id=f"user-{uuid.uuid4().hex[:8]}", password_hash="-", name="Test", role=UserRole.USER)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def accounts(db, user) -> dict:
+    """A bank account (1000), a credit card (limit 5000) and a wallet (50)"""
+    created = {
+        "bank": Account(user_id=user.id, type=AccountType.BANK, name="Bank",
+                        initial_balance=1000.0, current_balance=1000.0),
+        "card": Account(user_id=user.id, type=AccountType.CREDIT_CARD, name="Card",
+                        total_limit=5000.0, used_amount=0.0, billing_date=5, due_date=25),
+        "cash": Account(user_id=user.id, type=AccountType.CASH, name="Wallet",
+                        initial_balance=50.0, current_balance=50.0)
+    }
+    db.add_all(created.values())
+    db.commit()
+    return created
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.schema import CreateTable
+
+from app import archive
+from app.config import settings
+from app.database import engine
+from app.models import Transaction, TransactionType
+from app.services.transaction_service import TransactionService
+
+
+@pytest.fixture
+def archiving(monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_HOT_YEARS", 1)
+    yield
+    monkeypatch.setattr(settings, "ARCHIVE_HOT_YEARS", 0)
+    archive.move(engine)  # everything back for the other tests
+
+
+def _expense(db, user, account, on: date, description: str) -> Transaction:
+    return TransactionService.create_transaction(db, {
+        "type": TransactionType.EXPENSE,
+        "amount": 10.0,
+        "date": on,
+        "description": description,
+        "source_account_id": account.id
+    }, user.id)
+
+
+def test_archived_ids_are_not_reused_after_delete(db, user, accounts, archiving):
+    old = _expense(db, user, accounts["bank"], date(2020, 3, 1), "old one")
+    newest = _expense(db, user, accounts["bank"], date.today(), "newest")
+    old_id, newest_id = old.id, newest.id
+
+    assert archive.move(engine)[0] >= 1
+    assert db.query(Transaction).filter(Transaction.id == old_id).first() is None
+    # ...but still readable through the archive
+    txn = archive.transaction_source(db)
+    assert db.query(txn.id).filter(txn.user_id == user.id).count() == 2
+
+    # Delete the newest hot row, then insert: the id must not be an archived one
+    TransactionService.delete_transaction(db, db.get(Transaction, newest_id))
+    fresh = _expense(db, user, accounts["bank"], date.today(), "newer")
+    assert fresh.id not in (old_id, newest_id)
+
+    assert archive.restore(db, user.id, old_id)
+    db.commit()
+    rows = db.query(Transaction.id, Transaction.description).filter(Transaction.user_id == user.id).all()
+    assert sorted(rows) == sorted([(old_id, "old one"), (fresh.id, "newer")])
+
+
+def test_install_adds_autoincrement_to_legacy_table(tmp_path):
+    legacy_engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    legacy = archive._copy_of_hot()
+    legacy.dialect_options["sqlite"]["autoincrement"] = False
+    year = archive.year_table(2020)
+    with legacy_engine.begin() as conn:
+        conn.execute(CreateTable(legacy))
+        year.create(conn)
+        row = {"user_id": 1, "type": TransactionType.EXPENSE, "amount": 1.0, "date": date(2024, 1, 1)}
+        conn.execute(insert(legacy), [{**row, "id": 1}, {**row, "id": 2}])
+        conn.execute(insert(year), [{**row, "id": 7, "date": date(2020, 1, 1)}])
+
+    archive.install(legacy_engine)
+
+    with legacy_engine.begin() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'transactions'")).scalar()
+        assert "AUTOINCREMENT" in sql
+        assert conn.execute(text("SELECT count(*) FROM transactions")).scalar() == 2
+        new_id = conn.execute(insert(archive.hot).values(**row)).inserted_primary_key[0]
+    assert new_id == 8
@@ -0,0 +1,13 @@
+from types import SimpleNamespace
+
+from app.auth import get_current_user
+
+
+def test_disabled_user_is_logged_out(db, user):
+    request = SimpleNamespace(session={"user_id": user.id})
+    assert get_current_user(request, db).id == user.id
+
+    user.is_active = False
+    db.commit()
+    assert get_current_user(request, db) is None
+    assert request.session == {}
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from app import events
+
+
+class _RedisError(Exception):
+    pass
+
+
+class _DownRedis:
+    """Stands in for a client whose server is unreachable"""
+
+    @classmethod
+    def from_url(cls, url, **options):
+        return cls()
+
+    def publish(self, channel, message):
+        raise _RedisError("Connection refused")
+
+
+def test_publish_survives_redis_outage(monkeypatch):
+    monkeypatch.setattr(events, "redis", SimpleNamespace(Redis=_DownRedis, RedisError=_RedisError))
+    monkeypatch.setattr(events.RedisBackend, "_listen", lambda self: None)
+    delivered = []
+    backend = events.RedisBackend("redis://unreachable", lambda user_id, event: delivered.append((user_id, event)),
+                                  lambda: None)
+
+    backend.publish(7, {"type": "transaction"})
+
+    assert delivered == [(7, {"type": "resync"})]
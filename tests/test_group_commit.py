@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app import group_commit
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Category, CategoryType
+
+
+@pytest.fixture(autouse=True)
+def batching(monkeypatch):
+    # Long enough a wait that every write submitted together lands in one group
+    monkeypatch.setattr(settings, "WRITE_BATCHING_ENABLED", True)
+    monkeypatch.setattr(settings, "WRITE_BATCH_WAIT_MS", 200.0)
+
+
+def _add(user_id, name, fail=False):
+    def write(db):
+        db.add(Category(user_id=user_id, name=name, type=CategoryType.EXPENSE))
+        db.flush()
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        return name
+    return write
+
+
+def _run_together(db, writes) -> list:
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(
+            *(group_commit.run(db, write) for write in writes), return_exceptions=True
+        ), timeout=10)
+    return asyncio.run(run())
+
+
+def _names(db, user) -> set:
+    return {name for name, in db.query(Category.name).filter(Category.user_id == user.id)}
+
+
+def test_failing_write_is_rolled_back_alone(db, user):
+    results = _run_together(db, [_add(user.id, "first"), _add(user.id, "broken", fail=True), _add(user.id, "last")])
+
+    assert results[0] == "first" and results[2] == "last"
+    assert isinstance(results[1], RuntimeError)
+    assert _names(db, user) == {"first", "last"}
+
+
+def test_failed_group_commit_fails_every_write(db, user, monkeypatch):
+    def session_that_cannot_commit(**kw):
+        session = SessionLocal(**kw)
+
+        def commit():
+            raise RuntimeError("disk full")
+        session.commit = commit
+        return session
+    monkeypatch.setattr(group_commit, "SessionLocal", session_that_cannot_commit)
+
+    results = _run_together(db, [_add(user.id, "one"), _add(user.id, "two")])
+
+    assert [str(result) for result in results] == ["disk full", "disk full"]
+    assert _names(db, user) == set()
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+from app.models import NetWorthSnapshot, TransactionType
+from app.services.analytics_service import AnalyticsService
+from app.services.net_worth_service import NetWorthService
+from app.services.transaction_service import TransactionService
+
+
+def _create(db, user, type, amount, on, source=None, dest=None):
+    return TransactionService.create_transaction(db, {
+        "type": type,
+        "amount": amount,
+        "date": on,
+        "description": type.value,
+        "source_account_id": source.id if source else None,
+        "dest_account_id": dest.id if dest else None
+    }, user.id)
+
+
+def _stored(db, user) -> dict:
+    return dict(db.query(NetWorthSnapshot.day, NetWorthSnapshot.net_worth).filter(
+        NetWorthSnapshot.user_id == user.id
+    ).order_by(NetWorthSnapshot.day).all())
+
+
+def test_card_overpayment_is_clamped_and_snapshots_match(db, user, accounts):
+    bank, card = accounts["bank"], accounts["card"]
+    _create(db, user, TransactionType.EXPENSE, 150.0, date.today(), source=card)
+    _create(db, user, TransactionType.TRANSFER, 250.0, date.today(), source=bank, dest=card)
+
+    db.refresh(card)
+    assert card.used_amount == 0.0  # the extra 100 doesn't become a credit balance
+
+    live = AnalyticsService.calculate_net_worth(db, user.id)
+    assert live == 1000.0 - 250.0 + 50.0
+    assert list(_stored(db, user).values())[-1] == live
+    assert NetWorthService.get_series(db, user.id, granularity="day")["values"][-1] == live
+
+
+def test_incremental_updates_match_a_rebuild(db, user, accounts):
+    bank, card, cash = accounts["bank"], accounts["card"], accounts["cash"]
+    today = date.today()
+    _create(db, user, TransactionType.EXPENSE, 20.0, today - timedelta(days=3), source=cash)
+    _create(db, user, TransactionType.INCOME, 500.0, today - timedelta(days=40), dest=bank)
+    _create(db, user, TransactionType.EXPENSE, 75.0, today - timedelta(days=10), source=card)
+    spent = _create(db, user, TransactionType.EXPENSE, 30.0, today - timedelta(days=5), source=bank)
+    TransactionService.update_transaction(db, spent, {"amount": 45.0, "date": today - timedelta(days=12)})
+    TransactionService.delete_transaction(db, _create(db, user, TransactionType.INCOME, 9.0, today, dest=cash))
+
+    incremental = _stored(db, user)
+    NetWorthService.rebuild(db, user.id)
+    db.commit()
+    assert incremental == _stored(db, user)
+    assert incremental[today] == AnalyticsService.calculate_net_worth(db, user.id)
+
+
+def test_reading_the_series_writes_nothing(db, user, accounts):
+    _create(db, user, TransactionType.EXPENSE, 10.0, date.today(), source=accounts["bank"])
+    db.query(NetWorthSnapshot).filter(NetWorthSnapshot.user_id == user.id).delete()
+    db.commit()
+
+    series = NetWorthService.get_series(db, user.id, granularity="day")
+
+    assert series["values"][-1] == 1000.0 - 10.0 + 50.0
+    assert _stored(db, user) == {}
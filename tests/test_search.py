@@ -0,0 +1,23 @@
+from datetime import date
+
+from app.models import Transaction, TransactionType, User, UserRole
+from app.search import ranked_matches
+
+
+def _expense(db, user_id, description):
+    db.add(Transaction(user_id=user_id, type=TransactionType.EXPENSE, amount=10.0,
+                       date=date.today(), description=description))
+
+
+def test_ranking_only_covers_the_users_rows(db, user):
+    other = User(user_id=f"{user.user_id}-other", password_hash="-", name="Other", role=UserRole.USER)
+    db.add(other)
+    db.flush()
+    _expense(db, user.id, "Swiggy order")
+    for _ in range(3):
+        _expense(db, other.id, "Swiggy order")
+    db.commit()
+
+    ranked = ranked_matches(db, Transaction, "swig ord", user.id)
+    owners = db.query(Transaction.user_id).join(ranked, ranked.c.id == Transaction.id).all()
+    assert owners == [(user.id,)]
@@ -0,0 +1,47 @@
+from datetime import date
+
+from app import sync
+from app.models import Transaction, TransactionType
+from app.services.deletion_service import DeletionService
+from app.services.sync_service import SyncService
+from app.services.transaction_service import TransactionService
+
+
+def _create(db, user, type, source=None, dest=None):
+    return TransactionService.create_transaction(db, {
+        "type": type, "amount": 20.0, "date": date.today(), "description": type.value,
+        "source_account_id": source.id if source else None,
+        "dest_account_id": dest.id if dest else None
+    }, user.id)
+
+
+def test_deleted_transaction_leaves_a_tombstone(db, user, accounts):
+    expense = _create(db, user, TransactionType.EXPENSE, source=accounts["bank"])
+    expense_id = expense.id
+    since = sync.current_seq(db, user.id)
+
+    TransactionService.delete_transaction(db, expense)
+    delta = SyncService.changes(db, user.id, since)
+
+    assert not delta["full"]
+    assert delta["deleted"] == {"transactions": [expense_id]}
+    # The bank balance moved back, so the account is a change
+    assert [row["id"] for row in delta["changes"]["accounts"]] == [accounts["bank"].id]
+    assert SyncService.changes(db, user.id, delta["cursor"])["deleted"] == {}
+
+
+def test_deleted_account_tombstones_its_rows(db, user, accounts):
+    bank, cash = accounts["bank"], accounts["cash"]
+    only_cash = _create(db, user, TransactionType.EXPENSE, source=cash).id
+    transfer = _create(db, user, TransactionType.TRANSFER, source=bank, dest=cash).id
+    cash_id = cash.id
+    since = sync.current_seq(db, user.id)
+
+    DeletionService.delete_account(db, cash)
+    delta = SyncService.changes(db, user.id, since)
+
+    assert delta["deleted"] == {"transactions": [only_cash], "accounts": [cash_id]}
+    # The transfer survives with its deleted side cleared, as a change
+    changed = delta["changes"]["transactions"]
+    assert [(row["id"], row["dest_account_id"]) for row in changed] == [(transfer, None)]
+    assert not db.query(Transaction).filter(Transaction.id == only_cash).count()
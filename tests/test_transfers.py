@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+
+from app.models import Account, Transaction, TransactionType
+from app.services.deletion_service import DeletionService
+from app.services.transaction_service import TransactionService
+
+
+def _transfer(db, user, source, dest, amount=200.0):
+    return TransactionService.create_transaction(db, {
+        "type": TransactionType.TRANSFER, "amount": amount, "date": date.today(),
+        "description": "Move", "source_account_id": source, "dest_account_id": dest
+    }, user.id)
+
+
+def _balance(db, account_id):
+    return db.query(Account.current_balance).filter(Account.id == account_id).scalar()
+
+
+def test_transfer_needs_both_sides(db, user, accounts):
+    bank_id = accounts["bank"].id
+    with pytest.raises(ValueError):
+        _transfer(db, user, bank_id, None)
+    with pytest.raises(ValueError):
+        _transfer(db, user, None, bank_id)
+
+    assert db.query(Transaction).filter(Transaction.user_id == user.id).count() == 0
+    assert _balance(db, bank_id) == 1000.0
+
+
+def test_deleted_account_leaves_one_sided_transfer(db, user, accounts):
+    bank_id, cash_id = accounts["bank"].id, accounts["cash"].id
+    transfer = _transfer(db, user, bank_id, cash_id)
+    transfer_id = transfer.id
+    assert (_balance(db, bank_id), _balance(db, cash_id)) == (800.0, 250.0)
+
+    DeletionService.delete_account(db, accounts["cash"])
+    transfer = db.query(Transaction).filter(Transaction.id == transfer_id).one()
+    assert (transfer.source_account_id, transfer.dest_account_id) == (bank_id, None)
+
+    # Deleting what's left of it only gives the surviving side its money back
+    TransactionService.delete_transaction(db, transfer)
+    assert _balance(db, bank_id) == 1000.0